@@ -0,0 +1,43 @@
+"""
+本地 CSV 缓存读取（emis_p1_*.py 共用）
+"""
+
+import os
+import pandas as pd
+
+# 读写 parquet 失败时退回 CSV：未安装 pyarrow、文件损坏或目录只读
+try:
+    from pyarrow import ArrowException
+    PARQUET_ERRORS = (ImportError, OSError, ValueError, ArrowException)
+except ImportError:
+    PARQUET_ERRORS = (ImportError, OSError, ValueError)
+
+
+def _parquet_safe(df):
+    """
+    只有无时区或单一时区的 DatetimeIndex 才能原样存入 parquet；
+    混合偏移（如 DAX 的 +01:00/+02:00）读成 object 索引，parquet 会统一成一个
+    固定偏移，夏令时日期随之变成前一天 23:00
+    """
+    return isinstance(df.index, pd.DatetimeIndex)
+
+
+def read_cached_csv(csv_path):
+    """
+    read_csv(index_col=0, parse_dates=True)，并在 CSV 旁保存 <name>.csv.parquet (zstd)；
+    之后直接读 parquet，CSV 比 parquet 新时重新生成。
+    （旧版写的 <name>.parquet 可能已按单一偏移改写过日期，不再读取）
+    """
+    pq_path = csv_path + '.parquet'
+    if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(csv_path):
+        try:
+            return pd.read_parquet(pq_path, engine='pyarrow')
+        except PARQUET_ERRORS:
+            pass
+    df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+    if _parquet_safe(df):
+        try:
+            df.to_parquet(pq_path, engine='pyarrow', compression='zstd')
+        except PARQUET_ERRORS:
+            pass
+    return df
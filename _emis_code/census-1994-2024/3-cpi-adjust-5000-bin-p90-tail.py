@@ -13,7 +13,7 @@ Phase 3: CPI调整 + 统一Real 5000 Binning + 计算Tail Threshold
 
 Author: Fei-Yun Wang
 Date: 2026-02-20
-Version: v1.4
+Version: v1.5
 
 变更说明 (v1.0 → v1.1)
 -----------------------
@@ -68,6 +68,13 @@ Version: v1.4
         tail 1994,211634.4,,6581000.0,True  ← 严格衔接
     原因：bin宽度影响Phase 4的density计算（density = count / bin_width），
           虚假上界会低估最后一格的密度，扭曲指数段拟合
+
+变更说明 (v1.4 → v1.5)
+-----------------------
+[改动 H] add_density_columns() — 输出文件预计算派生列
+    原：Phase 4 / 4.2 每次运行都从 lower/upper/count 重新计算中点与密度
+    新：输出新增 mid, bw, density, log_mid, log_density 五列（tail rows 为 NaN）
+    原因：固定成本移入一次性ETL，下游拟合脚本直接读取
 """
 
 import os
@@ -274,7 +281,33 @@ def remap_bins(df, real_bins):
 
 
 # ============================================
-# 5. 计算P90（线性插值）
+# 5. 预计算派生列（供Phase 4直接读取）
+# ============================================
+
+def add_density_columns(df):
+    """
+    [改动 H] 追加 mid / bw / density / log_mid / log_density 列
+
+    tail rows 上界为 NaN，派生列自然为 NaN；
+    grid rows 的 count 均 > 0（remap_bins 已过滤），log 有定义。
+    """
+    lower = df['lower_bound_real'].to_numpy(copy=False)
+    upper = df['upper_bound_real'].to_numpy(copy=False)
+    count = df['count'].to_numpy(copy=False)
+
+    mid = (lower + upper) / 2
+    bw  = upper - lower
+    dens = count / bw
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_mid  = np.log(mid)
+        log_dens = np.log(dens)
+
+    return df.assign(mid=mid, bw=bw, density=dens,
+                     log_mid=log_mid, log_density=log_dens)
+
+
+# ============================================
+# 6. 计算P90（线性插值）
 # ============================================
 
 def compute_p90(df):
@@ -341,6 +374,9 @@ def main():
     p90 = compute_p90(df_remap)
     print(f"2024年 Real P90 = ${p90:,.0f}")
 
+    print("预计算 mid / density 派生列...")
+    df_remap = add_density_columns(df_remap)
+
     df_remap.to_csv(OUTPUT_FILE, index=False)
 
     print("Phase 3 完成")
@@ -36,7 +36,7 @@ from scipy.optimize import curve_fit
 PROJECT_DIR = './_emis_code/census-1994-2024/'
 PARSED_DIR  = os.path.join(PROJECT_DIR, 'parsed')
 
-INPUT_FILE       = os.path.join(PARSED_DIR, 'income_distribution_1994_2024_cpi_adjust.csv')
+INPUT_FILE       = os.path.join(PARSED_DIR, 'income_distribution_1994_2024_cpi_adjust.csv')   # 含Phase 3预计算的 mid/density/log_* 列
 MC_SCAN_FILE     = os.path.join(PARSED_DIR, 'p4_mc_scan.csv')
 EXP_FIT_FILE     = os.path.join(PARSED_DIR, 'p4_exp_fit.csv')
 PARETO_FIT_FILE  = os.path.join(PARSED_DIR, 'p4_pareto_fit.csv')
@@ -70,16 +70,6 @@ def cached(output_file, force=FORCE):
     return decorator
 
 
-def midpoint(row):
-    """取grid格中点作为代表收入值"""
-    return (row['lower_bound_real'] + row['upper_bound_real']) / 2
-
-
-def density(row):
-    """count / bin_width = 概率密度（未归一化）"""
-    return row['count'] / (row['upper_bound_real'] - row['lower_bound_real'])
-
-
 # ============================================
 # Step 1: 扫描 m_c
 # ============================================
@@ -124,10 +114,7 @@ def scan_mc_one_year(df_year):
     对单年数据扫描候选 m_c，返回最优 m_c 及各候选得分
     使用 grid rows（is_tail=False）做扫描
     """
-    df_grid = df_year[~df_year['is_tail']].copy()
-    df_grid = df_grid.dropna(subset=['upper_bound_real'])
-    df_grid['mid']     = df_grid.apply(midpoint, axis=1)
-    df_grid['density'] = df_grid.apply(density, axis=1)
+    df_grid = df_year[~df_year['is_tail']].dropna(subset=['upper_bound_real'])
     df_grid = df_grid[df_grid['density'] > 0].sort_values('mid')
 
     candidates = np.arange(MC_MIN, MC_MAX + MC_STEP, MC_STEP)
@@ -182,17 +169,14 @@ def fit_exp_one_year(df_year, mc):
     log P(m) = log P₀ - m/T  →  slope = -1/T
     返回: T, r2_exp, n_exp_bins
     """
-    df_grid = df_year[~df_year['is_tail']].copy()
-    df_grid = df_grid.dropna(subset=['upper_bound_real'])
-    df_grid['mid']     = df_grid.apply(midpoint, axis=1)
-    df_grid['density'] = df_grid.apply(density, axis=1)
+    df_grid = df_year[~df_year['is_tail']].dropna(subset=['upper_bound_real'])
     df_exp = df_grid[(df_grid['mid'] < mc) & (df_grid['density'] > 0)].sort_values('mid')
 
     if len(df_exp) < 3:
         return np.nan, np.nan, 0
 
     m_vals  = df_exp['mid'].values
-    log_d   = np.log(df_exp['density'].values)
+    log_d   = df_exp['log_density'].values
     slope, intercept, r, _, stderr = stats.linregress(m_vals, log_d)
 
     if slope >= 0:
@@ -225,6 +209,16 @@ def step2_fit_exp(df, df_mc):
 # Step 3: Pareto MLE，提取 α
 # ============================================
 
+# 逐年结果直接写入预分配的结构化数组，避免 list-of-dicts → DataFrame 的类型推断
+PARETO_FIT_DTYPE = np.dtype([
+    ('year',          'i4'),
+    ('alpha',         'f8'),
+    ('alpha_se',      'f8'),
+    ('r2_pow',        'f8'),
+    ('tail_fraction', 'f8'),
+    ('n_pow_bins',    'i4'),
+])
+
 def pareto_mle_one_year(df_year, mc):
     """
     Hill estimator（Clauset et al. 2009 eq.3）：
@@ -241,10 +235,7 @@ def pareto_mle_one_year(df_year, mc):
     对于单一open-ended bin，用 grid rows 中 m >= mc 的部分
     + tail bin count，在 log-log 空间做OLS，作为α的近似估计。
     """
-    df_grid = df_year[~df_year['is_tail']].copy()
-    df_grid = df_grid.dropna(subset=['upper_bound_real'])
-    df_grid['mid']     = df_grid.apply(midpoint, axis=1)
-    df_grid['density'] = df_grid.apply(density, axis=1)
+    df_grid = df_year[~df_year['is_tail']].dropna(subset=['upper_bound_real'])
 
     df_pow = df_grid[(df_grid['mid'] >= mc) & (df_grid['density'] > 0)].sort_values('mid')
 
@@ -265,8 +256,8 @@ def pareto_mle_one_year(df_year, mc):
     if len(df_pow) < 2:
         return np.nan, np.nan, tail_fraction
 
-    log_m = np.log(df_pow['mid'].values)
-    log_d = np.log(df_pow['density'].values)
+    log_m = df_pow['log_mid'].values
+    log_d = df_pow['log_density'].values
     slope, intercept, r, _, stderr = stats.linregress(log_m, log_d)
 
     if slope >= 0:
@@ -283,8 +274,8 @@ def pareto_mle_one_year(df_year, mc):
 def step3_fit_pareto(df, df_mc):
     """Step 3: 对所有年份拟合幂律段"""
     print("\n[Step 3] 拟合幂律段（Pareto α）...")
-    rows = []
-    for _, mc_row in df_mc.iterrows():
+    rows = np.empty(len(df_mc), dtype=PARETO_FIT_DTYPE)
+    for i, (_, mc_row) in enumerate(df_mc.iterrows()):
         year = int(mc_row['year'])
         mc   = mc_row['mc']
         df_year = df[df['year'] == year]
@@ -296,14 +287,9 @@ def step3_fit_pareto(df, df_mc):
         else:
             alpha, alpha_se, tail_frac, r2_pow, n_pow = result
 
-        rows.append({
-            'year':          year,
-            'alpha':         round(alpha, 4)    if not np.isnan(alpha)    else np.nan,
-            'alpha_se':      round(alpha_se, 4) if not np.isnan(alpha_se) else np.nan,
-            'r2_pow':        round(r2_pow, 4)   if not np.isnan(r2_pow)   else np.nan,
-            'tail_fraction': round(tail_frac, 4),
-            'n_pow_bins':    n_pow,
-        })
+        # np.round 对 NaN 原样返回，无需分支
+        rows[i] = (year, np.round(alpha, 4), np.round(alpha_se, 4),
+                   np.round(r2_pow, 4), np.round(tail_frac, 4), n_pow)
         if not np.isnan(alpha):
             print(f"  {year}: α = {alpha:.4f} ± {alpha_se:.4f}  R²_pow = {r2_pow:.4f}  "
                   f"tail = {tail_frac*100:.1f}%  bins = {n_pow}")
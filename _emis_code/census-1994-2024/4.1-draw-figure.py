@@ -23,11 +23,13 @@ import os
 import numpy as np
 import pandas as pd
 import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import matplotlib.patches as mpatches
 from matplotlib.collections import LineCollection
 from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 # ============================================
 # 配置
@@ -36,6 +38,7 @@ from matplotlib.colors import Normalize
 PROJECT_DIR  = './_emis_code/census-1994-2024/'
 PARSED_DIR   = os.path.join(PROJECT_DIR, 'parsed')
 INPUT_FILE   = os.path.join(PARSED_DIR, 'emis_timeseries.csv')
+STYLE_FILE   = os.path.join(PROJECT_DIR, '_emis_style.mplstyle')   # 4.1/4.2 共用出图风格
 
 # 两套数据集定义：(前缀, 起始年份, 标题后缀)
 DATASETS = [
@@ -56,10 +59,13 @@ EVENTS = [
     (2022, 'Fed Rate\nHikes',          'below'),
 ]
 
+# 事件标签底框（每个标签共用）
+_EVENT_BBOX = dict(boxstyle='round,pad=0.2', facecolor='white',
+                   edgecolor='#AAAAAA', alpha=0.85)
+
 # 顶刊配色（Nature风格）
 COLOR_MAIN   = '#2166AC'
 COLOR_WARM   = '#D6604D'
-COLOR_GRID   = '#CCCCCC'
 COLOR_FILL   = '#AEC7E8'
 ALPHA_FILL   = 0.25
 DPI_PNG      = 300
@@ -87,16 +93,24 @@ def outpath(prefix, name, ext):
 # Figure 1: 4面板时间序列
 # ============================================
 
+@plt.style.context(STYLE_FILE)
 def draw_figure1(df, prefix, title_suffix):
-    fig, axes = plt.subplots(4, 1, figsize=(10, 14), sharex=True)
+    fig  = _new_figure((10, 14))
+    axes = fig.subplots(4, 1, sharex=True)
     fig.subplots_adjust(hspace=0.08, top=0.93, bottom=0.07, left=0.12, right=0.95)
 
-    years = df['year'].values
+    # 各列只取一次 ndarray（数值列转 float32，绘图精度足够且减半内存），后续绘图直接复用
+    years     = df['year'].to_numpy(copy=False)
+    T         = df['T'].to_numpy(dtype=np.float32) / 1000
+    tail_pct  = df['tail_fraction'].to_numpy(dtype=np.float32) * 100
+    alpha     = df['alpha'].to_numpy(dtype=np.float32)
+    alpha_se  = df['alpha_se'].to_numpy(dtype=np.float32)
+    r2_exp    = df['r2_exp'].to_numpy(dtype=np.float32)
 
     # ── (a) 温度 T ──────────────────────────────
     ax = axes[0]
-    ax.plot(years, df['T'] / 1000, color=COLOR_MAIN, lw=2, zorder=3)
-    ax.fill_between(years, df['T'] / 1000, alpha=ALPHA_FILL, color=COLOR_FILL)
+    ax.plot(years, T, color=COLOR_MAIN, lw=2, zorder=3)
+    ax.fill_between(years, T, alpha=ALPHA_FILL, color=COLOR_FILL)
     ax.set_ylabel('Temperature $T$\n(thousand 2024 USD)', fontsize=10)
     ax.set_ylim(bottom=0)
     ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'${x:.0f}k'))
@@ -104,8 +118,8 @@ def draw_figure1(df, prefix, title_suffix):
 
     # ── (b) Tail fraction ───────────────────────
     ax = axes[1]
-    ax.plot(years, df['tail_fraction'] * 100, color=COLOR_WARM, lw=2, zorder=3)
-    ax.fill_between(years, df['tail_fraction'] * 100, alpha=ALPHA_FILL, color='#F4A582')
+    ax.plot(years, tail_pct, color=COLOR_WARM, lw=2, zorder=3)
+    ax.fill_between(years, tail_pct, alpha=ALPHA_FILL, color='#F4A582')
     ax.set_ylabel('Power-law fraction\n(% of households)', fontsize=10)
     ax.set_ylim(bottom=0)
     ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'{x:.0f}%'))
@@ -113,11 +127,11 @@ def draw_figure1(df, prefix, title_suffix):
 
     # ── (c) Pareto α ────────────────────────────
     ax = axes[2]
-    ax.plot(years, df['alpha'], color='#1A7B3A', lw=2, zorder=3)
+    ax.plot(years, alpha, color='#1A7B3A', lw=2, zorder=3)
     # 误差带
     ax.fill_between(years,
-                    df['alpha'] - df['alpha_se'],
-                    df['alpha'] + df['alpha_se'],
+                    alpha - alpha_se,
+                    alpha + alpha_se,
                     alpha=0.2, color='#1A7B3A')
     # 理论临界线 α=2（2D平衡态边界）
     ax.axhline(2.0, color='gray', lw=1, ls='--', zorder=2, label='α = 2 (2D equilibrium)')
@@ -128,8 +142,8 @@ def draw_figure1(df, prefix, title_suffix):
 
     # ── (d) R²_exp ──────────────────────────────
     ax = axes[3]
-    ax.plot(years, df['r2_exp'], color='#7B3294', lw=2, zorder=3)
-    ax.fill_between(years, df['r2_exp'], alpha=ALPHA_FILL, color='#C2A5CF')
+    ax.plot(years, r2_exp, color='#7B3294', lw=2, zorder=3)
+    ax.fill_between(years, r2_exp, alpha=ALPHA_FILL, color='#C2A5CF')
     ax.axhline(0.95, color='gray', lw=1, ls='--', zorder=2, label='$R^2 = 0.95$')
     ax.set_ylabel('Exponential fit $R^2$', fontsize=10)
     ax.set_ylim(0.4, 1.02)
@@ -138,13 +152,13 @@ def draw_figure1(df, prefix, title_suffix):
     _style_ax(ax, label='(d)')
 
     # X轴设置
-    xmin = df['year'].min() - 1
+    xmin = years.min() - 1
     ax.set_xlim(xmin, 2025)
     ax.xaxis.set_major_locator(plt.MultipleLocator(5))
     ax.xaxis.set_minor_locator(plt.MultipleLocator(1))
 
     # 标注2013缺失（仅94-24套需要）
-    if 2013 > df['year'].min():
+    if 2013 > years.min():
         for axi in axes:
             axi.axvline(2013, color='gray', lw=0.8, ls=':', alpha=0.6, zorder=1)
 
@@ -162,17 +176,16 @@ def draw_figure1(df, prefix, title_suffix):
 # ============================================
 
 def draw_figure2(df, prefix, title_suffix):
-    fig, ax = plt.subplots(figsize=(9, 7))
+    fig = _new_figure((9, 7))
+    ax  = fig.add_subplot()
     fig.subplots_adjust(left=0.12, right=0.88, top=0.90, bottom=0.10)
 
-    T     = df['T'].values / 1000
-    alpha = df['alpha'].values
-    years = df['year'].values
+    T     = df['T'].to_numpy(dtype=np.float32) / 1000
+    alpha = df['alpha'].to_numpy(dtype=np.float32)
+    years = df['year'].to_numpy(copy=False)
 
-    # 颜色映射：年份
+    # 颜色映射：年份（LineCollection / scatter 直接用 norm + cmap 名映射整个数组）
     norm   = Normalize(vmin=years.min(), vmax=years.max())
-    cmap   = cm.get_cmap('coolwarm')
-    colors = [cmap(norm(y)) for y in years]
 
     # 轨迹线（渐变色）
     points   = np.array([T, alpha]).T.reshape(-1, 1, 2)
@@ -187,12 +200,10 @@ def draw_figure2(df, prefix, title_suffix):
 
     # 标注关键年份（只标注数据集内存在的年份）
     label_years = {1994, 2000, 2008, 2020, 2022, 2024} & set(years.tolist())
-    for _, row in df.iterrows():
-        y = int(row['year'])
+    alpha_med   = np.nanmedian(alpha)
+    for y, t_val, a_val in zip(years.tolist(), T.tolist(), alpha.tolist()):
         if y in label_years:
-            t_val = row['T'] / 1000
-            a_val = row['alpha']
-            offset = (5, 8) if a_val > df['alpha'].median() else (5, -12)
+            offset = (5, 8) if a_val > alpha_med else (5, -12)
             ax.annotate(str(y), xy=(t_val, a_val),
                         xytext=(t_val + offset[0], a_val + offset[1]/100),
                         fontsize=8, color='#333333',
@@ -215,7 +226,7 @@ def draw_figure2(df, prefix, title_suffix):
                 arrowprops=dict(arrowstyle='->', color='#555555', lw=1.5))
 
     # Colorbar
-    cbar = plt.colorbar(sc, ax=ax, pad=0.02)
+    cbar = fig.colorbar(sc, ax=ax, pad=0.02)
     cbar.set_label('Year', fontsize=10)
     tick_years = [y for y in [1994, 2000, 2008, 2016, 2024] if y >= years.min()]
     cbar.set_ticks(tick_years)
@@ -237,12 +248,13 @@ def draw_figure2(df, prefix, title_suffix):
 # ============================================
 
 def draw_figure3(df, prefix, title_suffix):
-    fig, ax = plt.subplots(figsize=(12, 5))
+    fig = _new_figure((12, 5))
+    ax  = fig.add_subplot()
     fig.subplots_adjust(left=0.08, right=0.97, top=0.78, bottom=0.12)
 
-    years = df['year'].values
-    alpha = df['alpha'].values
-    se    = df['alpha_se'].values
+    years = df['year'].to_numpy(copy=False)
+    alpha = df['alpha'].to_numpy(dtype=np.float32)
+    se    = df['alpha_se'].to_numpy(dtype=np.float32)
 
     ax.plot(years, alpha, color='#1A7B3A', lw=2.5, zorder=3)
     ax.fill_between(years, alpha - se, alpha + se,
@@ -256,22 +268,20 @@ def draw_figure3(df, prefix, title_suffix):
 
     # 历史事件标注
     y_top = ax.get_ylim()[1] if ax.get_ylim()[1] > 0 else 7.0
+    y_label = {'above': 6.8, 'below': 5.8}
     for event_year, label, pos in EVENTS:
         ax.axvline(event_year, color='#888888', lw=1, ls=':', alpha=0.8, zorder=1)
-        y_label = 6.8 if pos == 'above' else 5.8
-        ax.text(event_year, y_label, label,
+        ax.text(event_year, y_label[pos], label,
                 ha='center', va='bottom', fontsize=7.5,
-                color='#444444',
-                bbox=dict(boxstyle='round,pad=0.2', facecolor='white',
-                          edgecolor='#AAAAAA', alpha=0.85))
+                color='#444444', bbox=_EVENT_BBOX)
 
     # 标注2013缺失（仅94-24套）
-    if df['year'].min() < 2013:
+    if years.min() < 2013:
         ax.axvline(2013, color='gray', lw=0.8, ls=':', alpha=0.5)
         ax.text(2013, alpha.min() - 0.15, '2013\n(missing)', ha='center',
                 fontsize=7, color='gray')
 
-    xmin = df['year'].min() - 1
+    xmin = years.min() - 1
     ax.set_xlim(xmin, 2025)
     ax.set_ylim(alpha.min() - 0.5, alpha.max() + 1.0)
     ax.xaxis.set_major_locator(plt.MultipleLocator(5))
@@ -292,20 +302,26 @@ def draw_figure3(df, prefix, title_suffix):
 # ============================================
 
 def _style_ax(ax, label=None):
-    """统一坐标轴风格"""
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.grid(axis='y', color=COLOR_GRID, lw=0.5, zorder=0)
-    ax.tick_params(labelsize=9)
+    """面板标签（spines / grid / 刻度字号由 STYLE_FILE 统一设置）"""
     if label:
         ax.text(0.01, 0.92, label, transform=ax.transAxes,
                 fontsize=11, fontweight='bold')
 
 
+# 所有图共用一个 Figure（不经 pyplot 状态机）：每张图开画前 clear 并设定尺寸
+_FIG = Figure()
+FigureCanvasAgg(_FIG)
+
+
+def _new_figure(figsize):
+    _FIG.clear()
+    _FIG.set_size_inches(figsize)
+    return _FIG
+
+
 def _save(fig, pdf_path, png_path):
     fig.savefig(pdf_path, dpi=300, bbox_inches='tight')
     fig.savefig(png_path, dpi=DPI_PNG, bbox_inches='tight')
-    plt.close(fig)
 
 
 # ============================================
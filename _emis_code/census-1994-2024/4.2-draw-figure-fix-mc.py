@@ -13,6 +13,8 @@ Phase 4.2: EMIS 2D模型可视化 — 固定 mc = $100k nominal × CPI
   data/cpi_yearly.csv          （年化CPI，Phase3输出）
 
 输出（94-24前缀）：
+  parsed/94-24-pareto_fit_fixmc.csv
+  parsed/94-24-emis_timeseries_fixmc.csv
   parsed/94-24-f1_timeseries_fixmc.pdf/png
   parsed/94-24-f2_phasediagram_fixmc.pdf/png
   parsed/94-24-f3_events_fixmc.pdf/png
@@ -29,15 +31,17 @@ Version: v1.0
 """
 
 import os
+from functools import lru_cache
 import numpy as np
 import pandas as pd
 from scipy import stats
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 from matplotlib.collections import LineCollection
 from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 # ============================================
 # 配置
@@ -50,6 +54,7 @@ DATA_DIR       = os.path.join(PROJECT_DIR, 'data')
 CPI_FILE       = os.path.join(DATA_DIR,   'cpi_yearly.csv')
 GRID_FILE      = os.path.join(PARSED_DIR, 'income_distribution_1994_2024_cpi_adjust.csv')
 TS_FILE        = os.path.join(PARSED_DIR, 'emis_timeseries.csv')
+STYLE_FILE     = os.path.join(PROJECT_DIR, '_emis_style.mplstyle')   # 与 4.1 共用出图风格
 
 PREFIX         = '94-24'
 EXCLUDE_YEARS  = {2013}
@@ -68,9 +73,12 @@ EVENTS = [
     (2022, 'Fed Rate\nHikes',          'below'),
 ]
 
+# 事件标签底框（每个标签共用）
+_EVENT_BBOX = dict(boxstyle='round,pad=0.2', facecolor='white',
+                   edgecolor='#AAAAAA', alpha=0.85)
+
 COLOR_MAIN  = '#2166AC'
 COLOR_WARM  = '#D6604D'
-COLOR_GRID  = '#CCCCCC'
 COLOR_FILL  = '#AEC7E8'
 ALPHA_FILL  = 0.25
 DPI_PNG     = 300
@@ -80,14 +88,17 @@ DPI_PNG     = 300
 # Step 1: 计算固定mc（real dollars）
 # ============================================
 
+@lru_cache(maxsize=1)
 def load_cpi(cpi_file):
-    """读取 cpi_yearly.csv → {year: inflation_factor}"""
+    """读取 cpi_yearly.csv → {year: inflation_factor}（按路径缓存，重复导入不再读盘）"""
     df = pd.read_csv(cpi_file)
     return dict(zip(df['year'].astype(int), df['inflation_factor']))
 
 
-def fixed_mc_real(cpi_factors):
-    """mc_real[year] = $100k × inflation_factor"""
+@lru_cache(maxsize=1)
+def fixed_mc_real(cpi_file):
+    """mc_real[year] = $100k × inflation_factor（结果缓存，调用方勿修改返回的dict）"""
+    cpi_factors = load_cpi(cpi_file)
     return {y: MC_NOMINAL * cpi_factors[y] for y in YEARS if y in cpi_factors}
 
 
@@ -95,6 +106,17 @@ def fixed_mc_real(cpi_factors):
 # Step 2: 重新拟合 α（固定mc）
 # ============================================
 
+# 逐年结果写入预分配的结构化数组（列顺序即输出CSV列顺序）
+ALPHA_FIT_DTYPE = np.dtype([
+    ('year',          'i4'),
+    ('alpha',         'f8'),
+    ('alpha_se',      'f8'),
+    ('r2_pow',        'f8'),
+    ('n_pow_bins',    'i4'),
+    ('mc_real',       'f8'),
+    ('tail_fraction', 'f8'),
+])
+
 def refit_alpha(grid_file, mc_real_dict):
     """
     对每年，在 lower_bound_real >= mc_real[year] 的 grid rows 上
@@ -103,31 +125,27 @@ def refit_alpha(grid_file, mc_real_dict):
     """
     df_all = pd.read_csv(grid_file)
 
-    results = []
+    results = np.empty(len(YEARS), dtype=ALPHA_FIT_DTYPE)
+    k = 0
     for year in YEARS:
         mc = mc_real_dict.get(year)
         if mc is None:
             continue
 
         df_year = df_all[df_all['year'] == year]
-        df_grid = df_year[~df_year['is_tail']].copy()
-        df_grid = df_grid.dropna(subset=['upper_bound_real'])
-
-        # 中点和密度
-        df_grid['mid']     = (df_grid['lower_bound_real'] + df_grid['upper_bound_real']) / 2
-        df_grid['bw']      = df_grid['upper_bound_real'] - df_grid['lower_bound_real']
-        df_grid['density'] = df_grid['count'] / df_grid['bw']
+        # 中点和密度已由Phase 3预计算（mid / density / log_mid / log_density）
+        df_grid = df_year[~df_year['is_tail']].dropna(subset=['upper_bound_real'])
 
         # 幂律段：mid >= mc
         df_pow = df_grid[(df_grid['mid'] >= mc) & (df_grid['density'] > 0)].sort_values('mid')
 
         if len(df_pow) < 3:
-            results.append({'year': year, 'alpha': np.nan, 'alpha_se': np.nan,
-                            'r2_pow': np.nan, 'n_pow_bins': len(df_pow), 'mc_real': mc})
+            results[k] = (year, np.nan, np.nan, np.nan, len(df_pow), mc, np.nan)
+            k += 1
             continue
 
-        log_m = np.log(df_pow['mid'].values)
-        log_d = np.log(df_pow['density'].values)
+        log_m = df_pow['log_mid'].to_numpy(copy=False)
+        log_d = df_pow['log_density'].to_numpy(copy=False)
         slope, intercept, r, p, se = stats.linregress(log_m, log_d)
 
         alpha   = -slope if slope < 0 else np.nan
@@ -139,16 +157,12 @@ def refit_alpha(grid_file, mc_real_dict):
         tail_hh  = df_year[df_year['is_tail']]['count'].sum()
         tail_frac = tail_hh / total_hh if total_hh > 0 else np.nan
 
-        results.append({
-            'year': year, 'alpha': round(alpha, 4) if not np.isnan(alpha) else np.nan,
-            'alpha_se': round(alpha_se, 4),
-            'r2_pow': round(r2_pow, 4) if not np.isnan(r2_pow) else np.nan,
-            'n_pow_bins': len(df_pow),
-            'mc_real': round(mc, 0),
-            'tail_fraction': round(tail_frac, 4),
-        })
+        results[k] = (year, np.round(alpha, 4), np.round(alpha_se, 4),
+                      np.round(r2_pow, 4), len(df_pow), np.round(mc, 0),
+                      np.round(tail_frac, 4))
+        k += 1
 
-    return pd.DataFrame(results)
+    return pd.DataFrame(results[:k])
 
 
 # ============================================
@@ -188,19 +202,26 @@ def outpath(name, ext):
 
 
 def _style_ax(ax, label=None):
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.grid(axis='y', color=COLOR_GRID, lw=0.5, zorder=0)
-    ax.tick_params(labelsize=9)
+    """面板标签（spines / grid / 刻度字号由 STYLE_FILE 统一设置）"""
     if label:
         ax.text(0.01, 0.92, label, transform=ax.transAxes,
                 fontsize=11, fontweight='bold')
 
 
+# 所有图共用一个 Figure（不经 pyplot 状态机）：每张图开画前 clear 并设定尺寸
+_FIG = Figure()
+FigureCanvasAgg(_FIG)
+
+
+def _new_figure(figsize):
+    _FIG.clear()
+    _FIG.set_size_inches(figsize)
+    return _FIG
+
+
 def _save(fig, name):
     fig.savefig(outpath(name, 'pdf'), dpi=300, bbox_inches='tight')
     fig.savefig(outpath(name, 'png'), dpi=DPI_PNG, bbox_inches='tight')
-    plt.close(fig)
     print(f"  saved → {PREFIX}-{name}_fixmc")
 
 
@@ -208,16 +229,22 @@ def _save(fig, name):
 # Figure 1: 4面板时间序列
 # ============================================
 
+@plt.style.context(STYLE_FILE)
 def draw_figure1(df):
-    fig, axes = plt.subplots(4, 1, figsize=(10, 14), sharex=True)
+    fig  = _new_figure((10, 14))
+    axes = fig.subplots(4, 1, sharex=True)
     fig.subplots_adjust(hspace=0.08, top=0.93, bottom=0.07, left=0.12, right=0.95)
 
-    years = df['year'].values
+    # 各列只取一次 ndarray（数值列转 float32，绘图精度足够且减半内存），后续绘图直接复用
+    years    = df['year'].to_numpy(copy=False)
+    T        = df['T'].to_numpy(dtype=np.float32) / 1000
+    tail_pct = df['tail_fraction'].to_numpy(dtype=np.float32) * 100
+    r2_exp   = df['r2_exp'].to_numpy(dtype=np.float32)
 
     # (a) 温度 T
     ax = axes[0]
-    ax.plot(years, df['T']/1000, color=COLOR_MAIN, lw=2, zorder=3)
-    ax.fill_between(years, df['T']/1000, alpha=ALPHA_FILL, color=COLOR_FILL)
+    ax.plot(years, T, color=COLOR_MAIN, lw=2, zorder=3)
+    ax.fill_between(years, T, alpha=ALPHA_FILL, color=COLOR_FILL)
     ax.set_ylabel('Temperature $T$\n(thousand 2024 USD)', fontsize=10)
     ax.set_ylim(bottom=0)
     ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'${x:.0f}k'))
@@ -225,8 +252,8 @@ def draw_figure1(df):
 
     # (b) Tail fraction
     ax = axes[1]
-    ax.plot(years, df['tail_fraction']*100, color=COLOR_WARM, lw=2, zorder=3)
-    ax.fill_between(years, df['tail_fraction']*100, alpha=ALPHA_FILL, color='#F4A582')
+    ax.plot(years, tail_pct, color=COLOR_WARM, lw=2, zorder=3)
+    ax.fill_between(years, tail_pct, alpha=ALPHA_FILL, color='#F4A582')
     ax.set_ylabel('Power-law fraction\n(% of households)', fontsize=10)
     ax.set_ylim(bottom=0)
     ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'{x:.0f}%'))
@@ -243,10 +270,13 @@ def draw_figure1(df):
         ax.axvspan(x_lo, x_hi, color='#DDDDDD', alpha=0.5, zorder=0,
                    label='Data insufficient (1994–1999)')
 
-    ax.plot(df_valid['year'], df_valid['alpha'], color='#1A7B3A', lw=2, zorder=3)
-    ax.fill_between(df_valid['year'],
-                    df_valid['alpha'] - df_valid['alpha_se'],
-                    df_valid['alpha'] + df_valid['alpha_se'],
+    v_years = df_valid['year'].to_numpy(copy=False)
+    v_alpha = df_valid['alpha'].to_numpy(dtype=np.float32)
+    v_se    = df_valid['alpha_se'].to_numpy(dtype=np.float32)
+    ax.plot(v_years, v_alpha, color='#1A7B3A', lw=2, zorder=3)
+    ax.fill_between(v_years,
+                    v_alpha - v_se,
+                    v_alpha + v_se,
                     alpha=0.2, color='#1A7B3A')
     ax.axhline(2.0, color='gray', lw=1, ls='--', label='α = 2 (2D equilibrium)')
     ax.axhline(1.0, color='red',  lw=1, ls=':',  label='α = 1 (marginal stability)')
@@ -256,8 +286,8 @@ def draw_figure1(df):
 
     # (d) R²_exp
     ax = axes[3]
-    ax.plot(years, df['r2_exp'], color='#7B3294', lw=2, zorder=3)
-    ax.fill_between(years, df['r2_exp'], alpha=ALPHA_FILL, color='#C2A5CF')
+    ax.plot(years, r2_exp, color='#7B3294', lw=2, zorder=3)
+    ax.fill_between(years, r2_exp, alpha=ALPHA_FILL, color='#C2A5CF')
     ax.axhline(0.95, color='gray', lw=1, ls='--', label='$R^2=0.95$')
     ax.set_ylabel('Exponential fit $R^2$', fontsize=10)
     ax.set_ylim(0.4, 1.02)
@@ -284,15 +314,15 @@ def draw_figure1(df):
 
 def draw_figure2(df):
     df_v = df.dropna(subset=['alpha']).copy()
-    fig, ax = plt.subplots(figsize=(9, 7))
+    fig = _new_figure((9, 7))
+    ax  = fig.add_subplot()
     fig.subplots_adjust(left=0.12, right=0.88, top=0.90, bottom=0.10)
 
-    T     = df_v['T'].values / 1000
-    alpha = df_v['alpha'].values
-    years = df_v['year'].values
+    T     = df_v['T'].to_numpy(dtype=np.float32) / 1000
+    alpha = df_v['alpha'].to_numpy(dtype=np.float32)
+    years = df_v['year'].to_numpy(copy=False)
 
     norm = Normalize(vmin=years.min(), vmax=years.max())
-    cmap = cm.get_cmap('coolwarm')
 
     points   = np.array([T, alpha]).T.reshape(-1, 1, 2)
     segments = np.concatenate([points[:-1], points[1:]], axis=1)
@@ -304,12 +334,10 @@ def draw_figure2(df):
                     s=60, zorder=3, edgecolors='white', linewidths=0.5)
 
     label_years = {1994, 2000, 2008, 2020, 2022, 2024} & set(years.tolist())
-    for _, row in df_v.iterrows():
-        y = int(row['year'])
+    alpha_med   = np.median(alpha)
+    for y, t_v, a_v in zip(years.tolist(), T.tolist(), alpha.tolist()):
         if y in label_years:
-            t_v = row['T'] / 1000
-            a_v = row['alpha']
-            dy  = 0.08 if a_v > df_v['alpha'].median() else -0.12
+            dy  = 0.08 if a_v > alpha_med else -0.12
             ax.annotate(str(y), xy=(t_v, a_v),
                         xytext=(t_v + 3, a_v + dy), fontsize=8, color='#333333',
                         arrowprops=dict(arrowstyle='-', color='#999999', lw=0.8))
@@ -327,7 +355,7 @@ def draw_figure2(df):
         ax.annotate('', xy=(T[mid+2], alpha[mid+2]), xytext=(T[mid], alpha[mid]),
                     arrowprops=dict(arrowstyle='->', color='#555555', lw=1.5))
 
-    cbar = plt.colorbar(sc, ax=ax, pad=0.02)
+    cbar = fig.colorbar(sc, ax=ax, pad=0.02)
     cbar.set_label('Year', fontsize=10)
     cbar.set_ticks([y for y in [1994, 2000, 2008, 2016, 2024] if y >= years.min()])
 
@@ -344,21 +372,24 @@ def draw_figure2(df):
 # ============================================
 
 def draw_figure3(df):
-    fig, ax = plt.subplots(figsize=(12, 5))
+    fig = _new_figure((12, 5))
+    ax  = fig.add_subplot()
     fig.subplots_adjust(left=0.08, right=0.97, top=0.78, bottom=0.12)
 
-    # 分段：有α的年份（实线）vs 无α的年份（虚线区域）
-    df_valid   = df.dropna(subset=['alpha']).copy()   # 2000+
-    df_invalid = df[df['alpha'].isna()].copy()         # 1994-1999
+    # 分段：有α的年份（实线）vs 无α的年份（虚线区域），一个NaN掩码完成
+    yr        = df['year'].to_numpy(copy=False)
+    alpha_all = df['alpha'].to_numpy(dtype=np.float32)
+    valid     = ~np.isnan(alpha_all)                   # 2000+
 
-    years = df_valid['year'].values
-    alpha = df_valid['alpha'].values
-    se    = df_valid['alpha_se'].values
+    years = yr[valid]
+    alpha = alpha_all[valid]
+    se    = df['alpha_se'].to_numpy(dtype=np.float32)[valid]
+    inv   = yr[~valid]                                 # 1994-1999
 
     # 1994-1999：灰色阴影区 + 虚线（用T/max_alpha做占位线）
-    if len(df_invalid) > 0:
-        x_lo = df_invalid['year'].min() - 0.5
-        x_hi = df_invalid['year'].max() + 0.5
+    if inv.size:
+        x_lo = inv.min() - 0.5
+        x_hi = inv.max() + 0.5
         ax.axvspan(x_lo, x_hi, color='#DDDDDD', alpha=0.5, zorder=0)
         ax.text((x_lo + x_hi) / 2, 0,   # y位置后面set_ylim后再定
                 'Data\nInsufficient\n(1994–1999)',
@@ -381,13 +412,11 @@ def draw_figure3(df):
 
     # 历史事件
     y_max = alpha.max() + 0.8
+    y_label = {'above': y_max - 0.1, 'below': y_max - 0.7}
     for event_year, label, pos in EVENTS:
         ax.axvline(event_year, color='#888888', lw=1, ls=':', alpha=0.8, zorder=1)
-        y_label = y_max - 0.1 if pos == 'above' else y_max - 0.7
-        ax.text(event_year, y_label, label, ha='center', va='top', fontsize=7.5,
-                color='#444444',
-                bbox=dict(boxstyle='round,pad=0.2', facecolor='white',
-                          edgecolor='#AAAAAA', alpha=0.85))
+        ax.text(event_year, y_label[pos], label, ha='center', va='top', fontsize=7.5,
+                color='#444444', bbox=_EVENT_BBOX)
 
     # 2013缺失
     ax.axvline(2013, color='gray', lw=0.8, ls=':', alpha=0.5)
@@ -411,6 +440,13 @@ def draw_figure3(df):
 # 主程序
 # ============================================
 
+def save_table(df, name):
+    """保存结果表为 parsed/{name}.csv"""
+    out_csv = os.path.join(PARSED_DIR, f'{name}.csv')
+    df.to_csv(out_csv, index=False)
+    print(f"  保存 → {out_csv}")
+
+
 def main():
     print("=" * 60)
     print("Phase 4.2: 固定mc重新拟合α + 出图")
@@ -419,8 +455,7 @@ def main():
 
     # 读取CPI
     print("\n读取CPI...")
-    cpi_factors = load_cpi(CPI_FILE)
-    mc_real_dict = fixed_mc_real(cpi_factors)
+    mc_real_dict = fixed_mc_real(CPI_FILE)
     print(f"  mc_real范围: ${min(mc_real_dict.values()):,.0f} – ${max(mc_real_dict.values()):,.0f}")
 
     # 重新拟合α
@@ -428,18 +463,14 @@ def main():
     df_alpha = refit_alpha(GRID_FILE, mc_real_dict)
 
     # 保存固定mc的拟合结果
-    out_alpha = os.path.join(PARSED_DIR, '94-24-pareto_fit_fixmc.csv')
-    df_alpha.to_csv(out_alpha, index=False)
-    print(f"  保存 → {out_alpha}")
+    save_table(df_alpha, '94-24-pareto_fit_fixmc')
 
     # 合并数据
     print("\n合并数据...")
     df = build_df(TS_FILE, df_alpha)
 
     # 保存合并后的时间序列
-    out_ts = os.path.join(PARSED_DIR, '94-24-emis_timeseries_fixmc.csv')
-    df.to_csv(out_ts, index=False)
-    print(f"  保存 → {out_ts}")
+    save_table(df, '94-24-emis_timeseries_fixmc')
 
     # 出图
     print("\n[Figure 1] 4面板时间序列...")
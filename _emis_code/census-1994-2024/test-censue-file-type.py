@@ -24,6 +24,9 @@ DATA_DIR = os.path.join(PROJECT_DIR, 'data')
 def detect_file_type(filepath):
     """
     Detect actual file type by inspecting file signature and content.
+
+    Returns (type_str, header_bytes); header_bytes is the first 4096 bytes,
+    reused by the caller for the preview so the file is opened only once.
     """
 
     try:
@@ -34,39 +37,42 @@ def detect_file_type(filepath):
 
         # ZIP-based formats (xlsx is zip)
         if header.startswith(b'PK'):
+            # Fast path: OOXML entry names in the first local headers
+            if b'[Content_Types].xml' in header and b'xl/' in header:
+                return "XLSX (Office Open XML - zipped)", header
+
             try:
-                with zipfile.ZipFile(filepath, 'r') as z:
-                    namelist = z.namelist()
-                    if any('xl/' in name for name in namelist):
-                        return "XLSX (Office Open XML - zipped)"
+                with zipfile.ZipFile(filepath, 'r', allowZip64=True) as z:
+                    if any('xl/' in zi.filename for zi in z.infolist()):
+                        return "XLSX (Office Open XML - zipped)", header
                     else:
-                        return "ZIP archive (not Excel)"
-            except:
-                return "Corrupted ZIP"
+                        return "ZIP archive (not Excel)", header
+            except (OSError, zipfile.BadZipFile):
+                return "Corrupted ZIP", header
 
         # Old binary XLS (BIFF) signature
         if header.startswith(b'\xD0\xCF\x11\xE0'):
-            return "XLS (Binary BIFF format)"
+            return "XLS (Binary BIFF format)", header
 
         # HTML disguised as XLS
         if "<html" in header_str:
-            return "HTML table (often mislabeled as .xls)"
+            return "HTML table (often mislabeled as .xls)", header
 
         # XML Excel 2003 format
         if "<?xml" in header_str and "<worksheet" in header_str:
-            return "Excel 2003 XML format"
+            return "Excel 2003 XML format", header
 
         if "<?xml" in header_str:
-            return "Generic XML"
+            return "Generic XML", header
 
         # CSV detection
         if "," in header_str[:1000]:
-            return "CSV or delimited text"
+            return "CSV or delimited text", header
 
-        return "Plain text / Unknown format"
+        return "Plain text / Unknown format", header
 
     except Exception as e:
-        return f"Error reading file: {e}"
+        return f"Error reading file: {e}", b""
 
 
 # ======================================================
@@ -82,33 +88,28 @@ def scan_directory(directory):
         print(f"Directory not found: {directory}")
         return
 
-    files = os.listdir(directory)
+    # scandir: one directory read, DirEntry caches type/stat info
+    with os.scandir(directory) as it:
+        entries = list(it)
 
-    if not files:
+    if not entries:
         print("No files found.")
         return
 
-    for filename in files:
-        filepath = os.path.join(directory, filename)
+    for entry in entries:
+        if entry.is_file():
+            size_mb = entry.stat().st_size / (1024 * 1024)
+            file_type, header = detect_file_type(entry.path)
 
-        if os.path.isfile(filepath):
-            size_mb = os.path.getsize(filepath) / (1024 * 1024)
-            file_type = detect_file_type(filepath)
-
-            print(f"\nFile: {filename}")
+            print(f"\nFile: {entry.name}")
             print(f"Size: {size_mb:.2f} MB")
             print(f"Detected Type: {file_type}")
 
-            # Optional: show preview
-            try:
-                with open(filepath, 'rb') as f:
-                    preview = f.read(300).decode(errors='ignore')
-                    print("Preview:")
-                    print("-" * 40)
-                    print(preview[:24])
-                    print("-" * 40)
-            except:
-                pass
+            # Optional: show preview (first 24 characters of the header)
+            print("Preview:")
+            print("-" * 40)
+            print(header[:300].decode(errors='ignore')[:24])
+            print("-" * 40)
 
 
 # ======================================================
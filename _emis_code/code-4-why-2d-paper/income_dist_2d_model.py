@@ -52,13 +52,27 @@
 """
 
 import os
+import hashlib
 import pickle
 import re
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
 import warnings
+
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'   # Rust 解析器, 比 openpyxl 快数倍
+except ImportError:
+    EXCEL_ENGINE = None         # pandas 默认 (openpyxl)
 warnings.filterwarnings('ignore')
 
 # ============================================
@@ -70,9 +84,12 @@ YEAR = 2024
 
 # 缓存目录
 PROJECT_DIR     = './_emis_code/code-4-why-2d-paper/'
-CACHE_DIR       = os.path.join(PROJECT_DIR, 'cache_income_dist')
+CACHE_DIR       = Path(PROJECT_DIR) / 'cache_income_dist'
 OUTPUT_DIR      = os.path.join(PROJECT_DIR, 'output')
 
+# 解析结果缓存版本: 修改 parse_income_ranges / _bins_frame 等解析逻辑后 +1, 旧缓存随之失效
+PARSER_VERSION = 1
+
 # 输出设置
 DPI_PDF = 300
 DPI_PNG = 150
@@ -89,24 +106,28 @@ plt.rcParams['axes.unicode_minus'] = False
 # 缓存工具函数
 # ============================================
 
-def ensure_cache_dir():
-    """确保缓存目录存在"""
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
-
 def save_cache(data, filename):
-    """保存数据到缓存（已禁用）"""
-    pass  # 禁用缓存保存
+    """保存数据到缓存"""
+    (CACHE_DIR / filename).write_bytes(pickle.dumps(data, protocol=5))
+
+def source_stamp(year):
+    """
+    该年份源Excel文件的指纹 (文件名 + mtime) 加 PARSER_VERSION
+    
+    用作缓存文件名的一部分, 源文件被替换或解析逻辑升级后旧缓存自然失效
+    """
+    paths = sorted(CACHE_DIR.glob(f'{year}-hinc*.xlsx'))
+    key = f'v{PARSER_VERSION}' + ''.join(p.name + str(p.stat().st_mtime) for p in paths)
+    return hashlib.md5(key.encode()).hexdigest()[:12]
 
 def load_cache(filename):
     """从缓存加载数据"""
-    path = os.path.join(CACHE_DIR, filename)
-    if os.path.exists(path):
-        with open(path, 'rb') as f:
-            data = pickle.load(f)
-        print(f"   [从缓存加载: {filename}]")
-        return data
-    return None
+    path = CACHE_DIR / filename
+    if not path.is_file():
+        return None
+    data = pickle.loads(path.read_bytes())
+    print(f"   [从缓存加载: {filename}]")
+    return data
 
 # ============================================
 # 初始化
@@ -120,7 +141,7 @@ print(f"  数据年份: {YEAR}")
 print(f"  临界点初值: ${M_CRITICAL_INITIAL:,}/年")
 print(f"  缓存目录: {CACHE_DIR}")
 
-ensure_cache_dir()
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ============================================
 # 步骤 1: 读取 Census Excel 数据 (宽表格格式)
@@ -130,45 +151,56 @@ print("\n" + "="*80)
 print("步骤 1: 读取 Census Bureau 收入数据")
 print("="*80)
 
-def parse_income_range_from_column(col_name):
+# 收入区间解析用正则
+_RANGE_TO_RE   = re.compile(r'^\D*(\d+).*? to \D*(\d+)')
+_FIRST_NUM_RE  = re.compile(r'(\d+)')
+_OPEN_UPPER_RE = re.compile(r'and over|or more', re.IGNORECASE)
+_UNDER_RE      = re.compile(r'under', re.IGNORECASE)
+
+
+def parse_income_ranges(labels):
     """
-    从列名解析收入区间
+    从列名/行描述解析收入区间（整列一次解析）
     
     示例:
     "$15,000 to $19,999" -> (15000, 19999)
-    "$200,000 and over" -> (200000, None)
+    "$200,000 and over" -> (200000, NaN)
     "Under $5,000" -> (0, 5000)
+    
+    返回 (income_min, income_max) 两个 float 数组，无法解析处为 NaN
+    """
+    text = pd.Series(labels, dtype=str).str.strip().str.replace(r'[,$]', '', regex=True)
+
+    is_to    = text.str.contains(' to ', regex=False).to_numpy()
+    is_open  = text.str.contains(_OPEN_UPPER_RE).to_numpy()
+    is_under = text.str.contains(_UNDER_RE).to_numpy()
+
+    to_parts  = text.str.extract(_RANGE_TO_RE).astype(float).to_numpy()
+    first_num = text.str.extract(_FIRST_NUM_RE)[0].astype(float).to_numpy()
+
+    # 优先级与逐个解析时相同: "X to Y" > "X and over" > "Under X"
+    income_min = np.where(is_to, to_parts[:, 0],
+                 np.where(is_open, first_num,
+                 np.where(is_under & ~np.isnan(first_num), 0.0, np.nan)))
+    income_max = np.where(is_to, to_parts[:, 1],
+                 np.where(is_open, np.nan,
+                 np.where(is_under, first_num, np.nan)))
+    return income_min, income_max
+
+
+def _bins_frame(income_min, income_max, households, source):
+    """
+    由筛选后的数组构造收入区间表（按列直接组装，不经逐行 dict / dtype 推断）
+    
+    开放上限区间 ("X and over") 的 income_max 保留为 NaN，由 load_census_data 统一补上
     """
-    text = str(col_name).strip()
-    
-    # 移除所有逗号和美元符号
-    text = text.replace(',', '').replace('$', '')
-    
-    # 处理 "X to Y" 格式
-    if ' to ' in text:
-        parts = text.split(' to ')
-        try:
-            lower = float(re.findall(r'\d+', parts[0])[0])
-            upper = float(re.findall(r'\d+', parts[1])[0])
-            return lower, upper
-        except:
-            return None, None
-    
-    # 处理 "X and over" 或 "X or more" 格式
-    if 'and over' in text.lower() or 'or more' in text.lower():
-        match = re.findall(r'\d+', text)
-        if match:
-            return float(match[0]), None
-        return None, None
-    
-    # 处理 "Under X" 格式
-    if 'under' in text.lower():
-        match = re.findall(r'\d+', text)
-        if match:
-            return 0, float(match[0])
-        return None, None
-    
-    return None, None
+    n = len(income_min)
+    return pd.DataFrame({
+        'income_min': income_min.astype(np.float64, copy=False),
+        'income_max': income_max.astype(np.float64, copy=False),
+        'households': households * 1000,   # Census数据单位是千
+        'source':     np.full(n, source, dtype=object),
+    })
 
 
 def read_hinc01_wide(year, cache_dir):
@@ -185,22 +217,19 @@ def read_hinc01_wide(year, cache_dir):
     else:
         filename = f'{year}-hinc01.xlsx'
     
-    filepath = os.path.join(cache_dir, filename)
+    filepath = Path(cache_dir) / filename
     
-    if not os.path.exists(filepath):
+    if not filepath.is_file():
         raise FileNotFoundError(f"文件不存在: {filepath}")
     
     print(f"读取文件: {filename}")
     
     # 读取数据，使用第7行作为表头
-    df = pd.read_excel(filepath, header=7)
+    df = pd.read_excel(filepath, header=7, engine=EXCEL_ENGINE)
     
     # 找到"All households"行（通常是第一个数据行）
-    all_households_row = None
-    for idx, row in df.iterrows():
-        if 'all households' in str(row.iloc[0]).lower():
-            all_households_row = idx
-            break
+    mask = df.iloc[:, 0].astype(str).str.lower().str.contains('all households', regex=False, na=False)
+    all_households_row = mask.idxmax() if mask.any() else None
     
     if all_households_row is None:
         raise ValueError("未找到'All households'行")
@@ -208,54 +237,24 @@ def read_hinc01_wide(year, cache_dir):
     # 提取该行数据
     data_row = df.iloc[all_households_row]
     
-    # 解析收入区间（从列名）
-    records = []
-    for col_idx, col_name in enumerate(df.columns):
-        col_name_str = str(col_name)
-        
-        # 跳过非收入列
-        if not ('$' in col_name_str or 'under' in col_name_str.lower()):
-            continue
-        
-        # 跳过统计列（Median income, Mean income等）
-        if 'median' in col_name_str.lower() or 'mean' in col_name_str.lower():
-            continue
-        if 'gini' in col_name_str.lower() or 'standard' in col_name_str.lower():
-            continue
-        if 'value' in col_name_str.lower() or 'dol' in col_name_str.lower():
-            continue
-        
-        # 解析收入区间
-        income_min, income_max = parse_income_range_from_column(col_name_str)
-        
-        if income_min is None:
-            continue
-        
-        # 获取家庭数量
-        households = data_row.iloc[col_idx]
-        
-        # 转换为数值
-        try:
-            households = float(households)
-            if pd.isna(households) or households <= 0:
-                continue
-        except:
-            continue
-        
-        # Census数据单位是千
-        households = households * 1000
-        
-        records.append({
-            'income_min': income_min,
-            'income_max': income_max if income_max is not None else income_min * 1.5,
-            'households': households,
-            'source': 'HINC-01'
-        })
+    # 一次性解析所有列名（收入区间）
+    cols  = pd.Index(df.columns.astype(str))
+    lower = cols.str.lower()
     
-    df_clean = pd.DataFrame(records)
+    # 只保留收入列，跳过统计列（Median income, Mean income, Gini等）
+    is_income = cols.str.contains('$', regex=False) | lower.str.contains('under', regex=False)
+    is_stat   = lower.str.contains('median|mean|gini|standard|value|dol', regex=True)
+    
+    income_min, income_max = parse_income_ranges(cols)
+    
+    # 家庭数量：非数值/缺失/非正数的列剔除
+    households = pd.to_numeric(data_row, errors='coerce').to_numpy(dtype=float)
+    
+    keep = is_income & ~is_stat & ~np.isnan(income_min) & (households > 0)
+    df_clean = _bins_frame(income_min[keep], income_max[keep], households[keep], 'HINC-01')
     
     print(f"  ✅ 读取成功: {len(df_clean)} 个收入区间")
-    print(f"     收入范围: ${df_clean['income_min'].min():,.0f} - ${df_clean['income_max'].max():,.0f}")
+    print(f"     收入范围: ${df_clean['income_min'].min():,.0f} - ${df_clean['income_min'].max():,.0f} 以上")
     print(f"     总家庭数: {df_clean['households'].sum():,.0f}")
     
     return df_clean
@@ -272,23 +271,20 @@ def read_hinc06_wide(year, cache_dir):
     - 后续行是具体收入区间
     """
     filename = f'{year}-hinc06.xlsx'
-    filepath = os.path.join(cache_dir, filename)
+    filepath = Path(cache_dir) / filename
     
-    if not os.path.exists(filepath):
+    if not filepath.is_file():
         print(f"  ⚠️ HINC-06文件不存在，跳过高收入细分")
         return None
     
     print(f"读取文件: {filename}")
     
     # 读取数据
-    df = pd.read_excel(filepath, header=None)
+    df = pd.read_excel(filepath, header=None, engine=EXCEL_ENGINE)
     
     # 找到"Income of Household"行（标记数据开始）
-    income_col_row = None
-    for idx, row in df.iterrows():
-        if 'income of household' in str(row.iloc[0]).lower():
-            income_col_row = idx
-            break
+    mask = df.iloc[:, 0].astype(str).str.contains('income of household', case=False, regex=False, na=False)
+    income_col_row = mask.idxmax() if mask.any() else None
     
     if income_col_row is None:
         print(f"  ⚠️ 未找到数据起始行")
@@ -297,56 +293,33 @@ def read_hinc06_wide(year, cache_dir):
     # 数据从income_col_row+1行开始
     # 第0列是收入区间描述，第1列是"All races"的Number
     
-    records = []
-    for idx in range(income_col_row + 2, len(df)):
-        row = df.iloc[idx]
-        
-        # 收入区间描述（第0列）
-        income_desc = str(row.iloc[0])
-        
-        # 跳过总计行
-        if 'total' in income_desc.lower() and not any(x in income_desc for x in ['$', 'to']):
-            continue
-        
-        # 解析收入区间
-        income_min, income_max = parse_income_range_from_column(income_desc)
-        
-        if income_min is None:
-            continue
-        
-        # 只保留$100k以上的数据（HINC-01已包含$100k以下）
-        if income_min < 100000:
-            continue
-        
-        # 家庭数量（第1列 - All races的Number）
-        households = row.iloc[1]
-        
-        # 转换为数值
-        try:
-            households = float(households)
-            if pd.isna(households) or households <= 0:
-                continue
-        except:
-            continue
-        
-        # Census数据单位是千
-        households = households * 1000
-        
-        records.append({
-            'income_min': income_min,
-            'income_max': income_max if income_max is not None else income_min * 1.5,
-            'households': households,
-            'source': 'HINC-06'
-        })
-    
-    if not records:
+    start = income_col_row + 2
+    
+    # 收入区间描述（第0列）
+    descs = df.iloc[start:, 0].astype(str)
+    
+    # 跳过总计行
+    is_total = (descs.str.lower().str.contains('total', regex=False)
+                & ~descs.str.contains('$', regex=False)
+                & ~descs.str.contains('to', regex=False)).to_numpy()
+    
+    # 解析收入区间
+    income_min, income_max = parse_income_ranges(descs)
+    
+    # 家庭数量（第1列 - All races的Number）
+    households = pd.to_numeric(df.iloc[start:, 1], errors='coerce').to_numpy(dtype=float)
+    
+    # 只保留$100k以上的数据（HINC-01已包含$100k以下）
+    keep = ~is_total & (income_min >= 100000) & (households > 0)
+    
+    if not keep.any():
         print(f"  ⚠️ 未能解析出有效数据")
         return None
     
-    df_clean = pd.DataFrame(records)
+    df_clean = _bins_frame(income_min[keep], income_max[keep], households[keep], 'HINC-06')
     
     print(f"  ✅ 读取成功: {len(df_clean)} 个高收入区间")
-    print(f"     收入范围: ${df_clean['income_min'].min():,.0f} - ${df_clean['income_max'].max():,.0f}")
+    print(f"     收入范围: ${df_clean['income_min'].min():,.0f} - ${df_clean['income_min'].max():,.0f} 以上")
     print(f"     总家庭数: {df_clean['households'].sum():,.0f}")
     
     return df_clean
@@ -357,7 +330,7 @@ def load_census_data(year):
     加载并合并Census数据
     """
     # 检查缓存
-    cache_filename = f'census_combined_{year}_fixed.pkl'
+    cache_filename = f'census_combined_{year}_{source_stamp(year)}.pkl'
     cached = load_cache(cache_filename)
     if cached is not None:
         return cached
@@ -385,14 +358,23 @@ def load_census_data(year):
     # 排序
     df_combined = df_combined.sort_values('income_min').reset_index(drop=True)
     
-    # 计算每个bin的中点和宽度
-    df_combined['income_mid'] = (df_combined['income_min'] + df_combined['income_max']) / 2
-    df_combined['bin_width'] = df_combined['income_max'] - df_combined['income_min']
-    
-    # 计算概率密度
-    total_households = df_combined['households'].sum()
-    df_combined['probability'] = df_combined['households'] / total_households
-    df_combined['density'] = df_combined['probability'] / df_combined['bin_width']
+    # 开放上限区间 ("X and over") 的上限取 income_min × 1.5
+    imin = df_combined['income_min'].to_numpy()
+    imax = df_combined['income_max'].to_numpy()
+    imax = np.where(np.isnan(imax), imin * 1.5, imax)
+    hh   = df_combined['households'].to_numpy()
+    
+    # 计算每个bin的中点和宽度, 以及概率密度
+    bin_width = imax - imin
+    total_households = hh.sum()
+    probability = hh / total_households
+    df_combined = df_combined.assign(
+        income_max  = imax,
+        income_mid  = 0.5 * (imin + imax),
+        bin_width   = bin_width,
+        probability = probability,
+        density     = probability / bin_width,
+    )
     
     print(f"\n数据统计:")
     print(f"  总家庭数: {total_households:,.0f}")
@@ -435,75 +417,143 @@ print("\n" + "="*80)
 print("步骤 2: 确定指数/幂律分段临界点")
 print("="*80)
 
-def find_critical_point(df, m_init=150000):
-    """
-    扫描不同的m_c候选值, 找到使两段拟合R²最大的临界点
+def _lsq1(x, y):
+    """一元线性最小二乘 y = slope·x + intercept 的闭式解 (代替 np.polyfit(x, y, 1))"""
+    xm = x.mean()
+    ym = y.mean()
+    dx = x - xm
+    slope = (dx * (y - ym)).sum() / (dx * dx).sum()
+    return slope, ym - slope * xm
+
+
+@njit(cache=True)
+def _best_mc(mid, dens, mc_candidates):
     """
-    print(f"扫描临界点范围: ${80000:,} - ${300000:,}")
+    m_c 扫描内核: 对每个候选做两段拟合, 返回综合R²最大的候选下标及其R²
     
-    # 候选临界点
-    candidates = np.arange(80000, 300000, 10000)
+    mid/dens 须已按 income_mid 升序; 密度 ≤ 0 的 bin 不参与拟合
+    - 低收入段: ln(P) = ln(A) - m/T, 以 y 为权重的线性最小二乘 (平方残差权重 y²)
+    - 高收入段: ln(P) = ln(B) - α ln(m), 不加权
+    R² 在原始密度尺度上计算; 无有效候选时返回 (-1, -inf)
+    """
+    n_all = mid.shape[0]
+    best_idx = -1
     best_r2 = -np.inf
-    best_mc = m_init
     
-    for mc in candidates:
-        # 分割数据
-        df_low = df[df['income_mid'] < mc].copy()
-        df_high = df[df['income_mid'] >= mc].copy()
+    for c in range(mc_candidates.shape[0]):
+        mc = mc_candidates[c]
+        
+        # 分割: mid 已排序, 低收入段为 [0, k_all), 高收入段为 [k_all, n_all)
+        k_all = 0
+        while k_all < n_all and mid[k_all] < mc:
+            k_all += 1
+        if k_all < 3 or n_all - k_all < 3:
+            continue
+        
+        # --- 低收入段: 累加充分统计量 → 闭式解 → 原始尺度 R² ---
+        n_low = 0
+        S1 = Sx = Sxx = Sy = Sxy = sum_y_low = 0.0
+        for i in range(k_all):
+            y = dens[i]
+            if y <= 0:
+                continue
+            x = mid[i]
+            ly = np.log(y)
+            w = y * y
+            n_low += 1
+            S1 += w
+            Sx += w * x
+            Sxx += w * x * x
+            Sy += w * ly
+            Sxy += w * x * ly
+            sum_y_low += y
+        if n_low < 3:
+            continue
+        den_low = Sxx - Sx * Sx / S1
+        if den_low == 0.0:
+            continue
+        slope_low = (Sxy - Sx * Sy / S1) / den_low
+        icpt_low = (Sy - slope_low * Sx) / S1
+        
+        mean_low = sum_y_low / n_low
+        res_low = tot_low = 0.0
+        for i in range(k_all):
+            y = dens[i]
+            if y <= 0:
+                continue
+            r = y - np.exp(icpt_low + slope_low * mid[i])
+            res_low += r * r
+            tot_low += (y - mean_low) ** 2
+        if tot_low == 0.0:
+            continue
+        r2_low = 1 - res_low / tot_low
         
-        if len(df_low) < 3 or len(df_high) < 3:
+        # 剪枝: r2_high ≤ 1, 综合R²上界为 0.7·r2_low + 0.3, 无法超过当前最优则跳过高收入段
+        if 0.7 * r2_low + 0.3 <= best_r2:
             continue
         
-        # 拟合低收入段 (指数)
-        try:
-            x_low = df_low['income_mid'].values
-            y_low = df_low['density'].values
-            
-            # 移除零值和负值
-            mask_low = y_low > 0
-            x_low = x_low[mask_low]
-            y_low = y_low[mask_low]
-            
-            if len(x_low) < 3:
+        # --- 高收入段 (log-log, 不加权) ---
+        n_high = 0
+        H1 = Hx = Hxx = Hy = Hxy = sum_y_high = 0.0
+        for i in range(k_all, n_all):
+            y = dens[i]
+            if y <= 0:
                 continue
-            
-            # log变换: ln(P) = ln(A) - m/T
-            popt_low, _ = curve_fit(lambda x, A, T: A * np.exp(-x/T),
-                                    x_low, y_low,
-                                    p0=[y_low[0], 50000],
-                                    maxfev=10000)
-            y_pred_low = popt_low[0] * np.exp(-x_low/popt_low[1])
-            r2_low = 1 - np.sum((y_low - y_pred_low)**2) / np.sum((y_low - y_low.mean())**2)
-            
-            # 拟合高收入段 (幂律)
-            x_high = df_high['income_mid'].values
-            y_high = df_high['density'].values
-            
-            # 移除零值和负值
-            mask_high = y_high > 0
-            x_high = x_high[mask_high]
-            y_high = y_high[mask_high]
-            
-            if len(x_high) < 3:
+            lx = np.log(mid[i])
+            ly = np.log(y)
+            n_high += 1
+            H1 += 1.0
+            Hx += lx
+            Hxx += lx * lx
+            Hy += ly
+            Hxy += lx * ly
+            sum_y_high += y
+        if n_high < 3:
+            continue
+        den_high = Hxx - Hx * Hx / H1
+        if den_high == 0.0:
+            continue
+        slope_high = (Hxy - Hx * Hy / H1) / den_high
+        icpt_high = (Hy - slope_high * Hx) / H1
+        
+        mean_high = sum_y_high / n_high
+        res_high = tot_high = 0.0
+        for i in range(k_all, n_all):
+            y = dens[i]
+            if y <= 0:
                 continue
-            
-            # log-log变换: ln(P) = ln(B) - α ln(m)
-            log_x = np.log(x_high)
-            log_y = np.log(y_high)
-            coeffs = np.polyfit(log_x, log_y, 1)
-            alpha = -coeffs[0]
-            B = np.exp(coeffs[1])
-            y_pred_high = B * x_high**(-alpha)
-            r2_high = 1 - np.sum((y_high - y_pred_high)**2) / np.sum((y_high - y_high.mean())**2)
-            
-            # 综合R² (加权平均)
-            total_r2 = 0.7 * r2_low + 0.3 * r2_high
-            
-            if total_r2 > best_r2:
-                best_r2 = total_r2
-                best_mc = mc
-        except:
+            r = y - np.exp(icpt_high + slope_high * np.log(mid[i]))
+            res_high += r * r
+            tot_high += (y - mean_high) ** 2
+        if tot_high == 0.0:
             continue
+        
+        # 综合R² (加权平均)
+        total_r2 = 0.7 * r2_low + 0.3 * (1 - res_high / tot_high)
+        
+        if total_r2 > best_r2:
+            best_r2 = total_r2
+            best_idx = c
+    
+    return best_idx, best_r2
+
+
+def find_critical_point(df, m_init=150000):
+    """
+    扫描不同的m_c候选值, 找到使两段拟合R²最大的临界点
+    """
+    print(f"扫描临界点范围: ${80000:,} - ${300000:,}")
+    
+    # 候选临界点
+    candidates = np.arange(80000, 300000, 10000)
+    
+    # 排序后交给数值内核扫描
+    order = np.argsort(df['income_mid'].values)
+    mid   = df['income_mid'].values[order].astype(np.float64)
+    dens  = df['density'].values[order].astype(np.float64)
+    
+    i_best, best_r2 = _best_mc(mid, dens, candidates.astype(np.float64))
+    best_mc = candidates[i_best] if i_best >= 0 else m_init
     
     # 计算该临界点对应的百分位
     cumsum = df['households'].cumsum()
@@ -573,9 +623,9 @@ y_high = y_high[mask_high]
 # 在log-log空间做线性回归
 log_x = np.log(x_high)
 log_y = np.log(y_high)
-coeffs = np.polyfit(log_x, log_y, 1)
-alpha_fit = -coeffs[0]  # 幂律指数
-B_fit = np.exp(coeffs[1])  # 归一化常数
+slope_high, intercept_high = _lsq1(log_x, log_y)
+alpha_fit = -slope_high  # 幂律指数
+B_fit = np.exp(intercept_high)  # 归一化常数
 y_pred_high = B_fit * x_high**(-alpha_fit)
 r2_high = 1 - np.sum((y_high - y_pred_high)**2) / np.sum((y_high - y_high.mean())**2)
 
@@ -12,6 +12,8 @@ UN Comtrade Token 测试脚本
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 import sys
@@ -55,6 +57,13 @@ print("-"*60)
 
 url = "https://comtradeapi.un.org/data/v1/get/C/A/HS"
 
+# 复用连接 + 对5xx瞬时错误自动重试（429不重试，保留下面的配额提示）
+session = requests.Session()
+session.mount('https://', HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=1,
+                      status_forcelist=[500, 502, 503, 504],
+                      raise_on_status=False)))
+
 
 
 headers = {"Ocp-Apim-Subscription-Key": COMTRADE_TOKEN}
@@ -78,7 +87,7 @@ print(f"  流向: Import")
 print("\n⏳ 发送请求...")
 
 try:
-    response = requests.get(url, headers=headers, params=params, timeout=30)
+    response = session.get(url, headers=headers, params=params, timeout=30)
     
     print(f"✓ 响应状态码: {response.status_code}")
     
@@ -18,20 +18,35 @@ import sys
 import json
 import time
 import pickle
+import asyncio
 import hashlib
+import functools
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import requests
-from scipy.optimize import curve_fit
-from scipy.stats import linregress
+from scipy.linalg import cho_factor, cho_solve, solve
+import httpx
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set matplotlib to use English and proper fonts
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.unicode_minus'] = False
+# numba is optional: without it the kernels below run as plain Python
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+# orjson is optional: faster parsing of the Comtrade response bodies
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# joblib is optional: without it the bootstrap runs serially
+try:
+    from joblib import Parallel, delayed
+except ImportError:
+    Parallel = None
 
 # ============================================
 # CONFIGURATION
@@ -41,6 +56,7 @@ CACHE_DIR       = os.path.join(PROJECT_DIR, 'cache_trade_gravity')
 OUTPUT_DIR      = os.path.join(PROJECT_DIR, 'output')
 
 CEPII_DATA = os.path.join(CACHE_DIR, 'dist_cepii.dta')
+CEPII_PARQUET = os.path.join(CACHE_DIR, 'dist_cepii.parquet')
 
 # Data year
 YEAR = 2019
@@ -90,8 +106,34 @@ COUNTRY_CODE_MAP = {
 # Reverse mapping (Numeric code → ISO3)
 CODE_TO_ISO = {v: k for k, v in COUNTRY_CODE_MAP.items()}
 
-# API request delay (seconds)
-API_DELAY = 1.5
+def code_to_iso(code):
+    """Numeric code from the API (returned as int, e.g. 76) → ISO3 ('076' → 'BRA')"""
+    return CODE_TO_ISO.get(str(code).zfill(3))
+
+# Rate-limit pacing: back off when fewer than RATE_LIMIT_FLOOR calls remain
+# in the current window; RATE_LIMIT_WAIT (s) is used when no Retry-After is sent
+RATE_LIMIT_FLOOR = 5
+RATE_LIMIT_WAIT = 60
+
+# Comtrade endpoint, reporters per request, and max concurrent requests
+COMTRADE_URL = "https://comtradeapi.un.org/data/v1/get/C/A/HS"
+REPORTER_BATCH = 10
+API_CONCURRENCY = 5
+
+# Shared HTTP/2 client for synchronous calls (keep-alive; the transport retries
+# failed connects, http_get retries transient status codes)
+CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(http2=True, retries=3),
+    timeout=60, limits=httpx.Limits(max_connections=10))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def http_get(url, retries=3, **kwargs):
+    """GET through CLIENT, backing off 1s, 2s, 4s on RETRY_STATUS"""
+    for attempt in range(retries + 1):
+        response = CLIENT.get(url, **kwargs)
+        if response.status_code not in RETRY_STATUS or attempt == retries:
+            return response
+        time.sleep(2 ** attempt)
 
 # Output settings
 # OUTPUT_DIR = '.'
@@ -106,24 +148,47 @@ def ensure_cache_dir():
     if not os.path.exists(CACHE_DIR):
         os.makedirs(CACHE_DIR)
 
+@functools.lru_cache(maxsize=128)
+def _params_hash(params_items):
+    """MD5 prefix of the sorted params; takes a tuple of items so the result can be memoized"""
+    param_str = json.dumps(dict(params_items), sort_keys=True)
+    return hashlib.md5(param_str.encode()).hexdigest()[:8]
+
 def get_cache_path(name, params=None):
     if params:
-        param_str = json.dumps(params, sort_keys=True)
-        param_hash = hashlib.md5(param_str.encode()).hexdigest()[:8]
+        param_hash = _params_hash(tuple(sorted(params.items())))
         filename = f"{name}_{param_hash}.pkl"
     else:
         filename = f"{name}.pkl"
     return os.path.join(CACHE_DIR, filename)
 
 def save_cache(data, name, params=None):
+    """DataFrames go to Parquet (zstd) next to the .pkl path; anything else, or no pyarrow, is pickled"""
     ensure_cache_dir()
     cache_path = get_cache_path(name, params)
+    if isinstance(data, pd.DataFrame):
+        parquet_path = cache_path[:-len('.pkl')] + '.parquet'
+        try:
+            data.to_parquet(parquet_path, engine='pyarrow', compression='zstd')
+            print(f"   [Cached: {os.path.basename(parquet_path)}]")
+            return
+        except ImportError:
+            pass
     with open(cache_path, 'wb') as f:
         pickle.dump(data, f)
     print(f"   [Cached: {os.path.basename(cache_path)}]")
 
 def load_cache(name, params=None):
+    """Parquet first; fall back to the .pkl written by older runs"""
     cache_path = get_cache_path(name, params)
+    parquet_path = cache_path[:-len('.pkl')] + '.parquet'
+    if os.path.exists(parquet_path):
+        try:
+            data = pd.read_parquet(parquet_path, engine='pyarrow')
+            print(f"   [Loading from cache: {os.path.basename(parquet_path)}]")
+            return data
+        except ImportError:
+            pass
     if os.path.exists(cache_path):
         with open(cache_path, 'rb') as f:
             data = pickle.load(f)
@@ -131,6 +196,12 @@ def load_cache(name, params=None):
         return data
     return None
 
+def cache_mtime(name, params=None):
+    """Modification time of a cache entry (Parquet or pickle); 0 if it doesn't exist"""
+    cache_path = get_cache_path(name, params)
+    paths = [cache_path[:-len('.pkl')] + '.parquet', cache_path]
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0.0)
+
 # ============================================
 # INITIALIZATION
 # ============================================
@@ -169,10 +240,18 @@ def load_cepii_distances():
     print("Loading CEPII distance data...")
     
     path = CEPII_DATA  # 你本地路径
-    
-    df = pd.read_stata(path)
+    cols = ['iso_o', 'iso_d', 'dist']
 
-    df = df[['iso_o', 'iso_d', 'dist']].copy()
+    # .dta 解析较慢：首次运行转存为 parquet，之后只读这三列
+    try:
+        if not os.path.exists(CEPII_PARQUET):
+            pd.read_stata(path, columns=cols).to_parquet(
+                CEPII_PARQUET, engine='pyarrow', compression='zstd', index=False)
+        df = pd.read_parquet(CEPII_PARQUET, engine='pyarrow', columns=cols)
+    except ImportError:  # 未安装 pyarrow
+        df = pd.read_stata(path, columns=cols)
+
+    df = df[cols].copy()
     df = df.dropna(subset=['dist'])
 
     df = df[df['iso_o'].isin(COUNTRIES) &
@@ -233,19 +312,21 @@ def create_synthetic_distances():
     }
     
     available = [c for c in COUNTRIES if c in coords]
-    data = []
-    
-    for iso_o in available:
-        for iso_d in available:
-            if iso_o != iso_d:
-                lat1, lon1 = np.radians(coords[iso_o])
-                lat2, lon2 = np.radians(coords[iso_d])
-                dlat, dlon = lat2 - lat1, lon2 - lon1
-                a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-                dist = 6371 * 2 * np.arcsin(np.sqrt(a))
-                data.append({'iso_o': iso_o, 'iso_d': iso_d, 'dist': dist})
-    
-    df = pd.DataFrame(data)
+    N = len(available)
+    
+    # Haversine for all (origin, destination) pairs at once: (N,1) vs (1,N) broadcast
+    lats, lons = np.radians(np.array([coords[c] for c in available])).T
+    dlat = lats[None, :] - lats[:, None]
+    dlon = lons[None, :] - lons[:, None]
+    a = np.sin(dlat/2)**2 + np.cos(lats)[:, None] * np.cos(lats)[None, :] * np.sin(dlon/2)**2
+    dist = 6371 * 2 * np.arcsin(np.sqrt(a))
+    
+    df = pd.DataFrame({
+        'iso_o': np.repeat(available, N),
+        'iso_d': np.tile(available, N),
+        'dist': dist.ravel()
+    })
+    df = df[df['iso_o'] != df['iso_d']].reset_index(drop=True)
     print(f"Generated: {len(available)} countries")
     save_cache(df, 'distances')
     return df
@@ -274,7 +355,7 @@ def download_worldbank_gdp(year):
     params = {'date': year, 'format': 'json', 'per_page': 300}
     
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = http_get(url, params=params, timeout=30)
         if response.status_code == 200:
             data = response.json()
             if len(data) > 1 and isinstance(data[1], list):
@@ -318,6 +399,9 @@ def create_synthetic_gdp():
 
 gdp_df = download_worldbank_gdp(YEAR)
 
+# ISO3 → GDP lookup, shared by the synthetic trade generator and Step 4
+gdp_map = gdp_df.set_index('country_code')['gdp'].to_dict()
+
 # ============================================
 # STEP 3: UN COMTRADE TRADE DATA
 # ============================================
@@ -326,6 +410,112 @@ print("\n" + "="*80)
 print("STEP 3: UN Comtrade Trade Data")
 print("="*80)
 
+def rate_limit_wait(response):
+    """Seconds to pause after a response: Retry-After on 429 or when the window is nearly spent, else 0"""
+    retry_after = response.headers.get('Retry-After', '')
+    wait = int(retry_after) if retry_after.isdigit() else RATE_LIMIT_WAIT
+    if response.status_code == 429:
+        return wait
+    remaining = response.headers.get('X-RateLimit-Remaining', '')
+    if remaining.isdigit() and int(remaining) < RATE_LIMIT_FLOOR:
+        return wait
+    return 0
+
+async def fetch_batch(client, sem, auth_failed, year, reporters, partner_codes, label, retries=3):
+    """Download imports of a batch of reporters in one request; returns {'iso_o','iso_d','trade'} records"""
+    params = {
+        'reporterCode': ','.join(COUNTRY_CODE_MAP[c] for c in reporters),
+        'period': str(year),
+        'partnerCode': ','.join(partner_codes),
+        'flowCode': 'M',
+        'maxRecords': '100000'
+    }
+    
+    async with sem:
+        for attempt in range(retries + 1):
+            if auth_failed.is_set():
+                return []
+            
+            print(f"  Downloading batch {label}: {', '.join(reporters)}...")
+            try:
+                response = await client.get(COMTRADE_URL, params=params)
+            except httpx.HTTPError as e:
+                print(f"    Batch {label} exception: {str(e)[:100]}")
+                return []
+            
+            # Pause only when the API says so; the slot is held so other batches wait too
+            wait = rate_limit_wait(response)
+            if response.status_code == 429 and attempt == retries:
+                break
+            if wait:
+                print(f"    Batch {label}: rate limit {'hit' if response.status_code == 429 else 'nearly spent'}, waiting {wait}s...")
+                await asyncio.sleep(wait)
+            if response.status_code != 429:
+                break
+        if response.status_code == 429:
+            print(f"    Batch {label} failed: still rate limited after {retries + 1} attempts")
+            return []
+
+    if response.status_code == 401:
+        print(f"    Error: Invalid token (401)")
+        auth_failed.set()
+        return []
+    
+    if response.status_code != 200:
+        print(f"    Batch {label} failed (status: {response.status_code})")
+        return []
+    
+    try:
+        result = json_loads(response.content)
+    except ValueError as e:
+        print(f"    Batch {label} exception: {str(e)[:100]}")
+        return []
+    
+    if 'data' not in result or len(result['data']) == 0:
+        print(f"    Batch {label}: no data returned")
+        return []
+    
+    records = []
+    for record in result['data']:
+        reporter_iso = code_to_iso(record.get('reporterCode', ''))
+        partner_iso = code_to_iso(record.get('partnerCode', ''))
+        value = record.get('primaryValue', 0)
+        
+        if reporter_iso and partner_iso and value:
+            records.append({
+                'iso_o': partner_iso,
+                'iso_d': reporter_iso,
+                'trade': float(value)
+            })
+    
+    print(f"    Batch {label} success ({len(result['data'])} raw records)")
+    return records
+
+async def download_all_reporters(year, countries, token):
+    """Fetch reporters in batches of REPORTER_BATCH, at most API_CONCURRENCY requests in flight"""
+    reporters = [c for c in countries if c in COUNTRY_CODE_MAP]
+    for c in countries:
+        if c not in COUNTRY_CODE_MAP:
+            print(f"  Warning: {c} missing numeric code, skipped")
+    
+    # Own-country rows are dropped after aggregation, so every batch can share one partner list
+    partner_codes = [COUNTRY_CODE_MAP[c] for c in reporters]
+    batches = [reporters[i:i + REPORTER_BATCH] for i in range(0, len(reporters), REPORTER_BATCH)]
+    
+    headers = {'Ocp-Apim-Subscription-Key': token}
+    sem = asyncio.Semaphore(API_CONCURRENCY)
+    auth_failed = asyncio.Event()
+    
+    async with httpx.AsyncClient(http2=True, headers=headers, timeout=60,
+                                 limits=httpx.Limits(max_connections=10)) as client:
+        results = await asyncio.gather(*(
+            fetch_batch(client, sem, auth_failed, year, batch, partner_codes,
+                        f"{k}/{len(batches)}")
+            for k, batch in enumerate(batches, 1)
+        ))
+    
+    return [record for records in results for record in records]
+
 def download_comtrade_data(year, countries, token):
     cache_params = {'year': year, 'countries': ','.join(sorted(countries))}
     cached = load_cache('trade', params=cache_params)
@@ -338,71 +528,9 @@ def download_comtrade_data(year, countries, token):
     
     print(f"Downloading UN Comtrade trade data ({year})...")
     print(f"  API format: Ocp-Apim-Subscription-Key")
-    print(f"  This may take several minutes...")
+    print(f"  Reporters per request: {REPORTER_BATCH}, concurrent requests: {API_CONCURRENCY}")
     
-    base_url = "https://comtradeapi.un.org/data/v1/get/C/A/HS"
-    all_data = []
-    
-    for i, reporter_iso in enumerate(countries, 1):
-        reporter_code = COUNTRY_CODE_MAP.get(reporter_iso)
-        if not reporter_code:
-            print(f"  Warning: {reporter_iso} missing numeric code, skipped")
-            continue
-        
-        print(f"  Downloading {reporter_iso} (code:{reporter_code}) data ({i}/{len(countries)})...")
-        
-        partner_codes = [COUNTRY_CODE_MAP[c] for c in countries 
-                        if c != reporter_iso and c in COUNTRY_CODE_MAP]
-        
-        headers = {'Ocp-Apim-Subscription-Key': token}
-        params = {
-            'reporterCode': reporter_code,
-            'period': str(year),
-            'partnerCode': ','.join(partner_codes),
-            'flowCode': 'M',
-            'maxRecords': '500'
-        }
-        
-        try:
-            response = requests.get(base_url, headers=headers, params=params, timeout=60)
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                if 'data' in result and len(result['data']) > 0:
-                    for record in result['data']:
-                        partner_code = str(record.get('partnerCode', ''))
-                        value = record.get('primaryValue', 0)
-                        partner_iso = CODE_TO_ISO.get(partner_code)
-                        
-                        if partner_iso and value:
-                            all_data.append({
-                                'iso_o': partner_iso,
-                                'iso_d': reporter_iso,
-                                'trade': float(value)
-                            })
-                    
-                    print(f"    Success ({len(result['data'])} raw records)")
-                else:
-                    print(f"    No data returned")
-            
-            elif response.status_code == 401:
-                print(f"    Error: Invalid token (401)")
-                break
-            
-            elif response.status_code == 429:
-                print(f"    Rate limit hit, waiting 60s...")
-                time.sleep(60)
-                continue
-            
-            else:
-                print(f"    Failed (status: {response.status_code})")
-            
-            time.sleep(API_DELAY)
-        
-        except Exception as e:
-            print(f"    Exception: {str(e)[:100]}")
-            continue
+    all_data = asyncio.run(download_all_reporters(year, countries, token))
     
     if all_data:
         df = pd.DataFrame(all_data)
@@ -420,16 +548,20 @@ def download_comtrade_data(year, countries, token):
         print("Using synthetic data as fallback...")
         return create_synthetic_trade()
 
+@njit(parallel=True, cache=True)
+def _gravity(gdp_o, gdp_d, dist, noise, G, beta):
+    """Fused G * gdp_o * gdp_d / dist**beta * noise, one pass over the pairs"""
+    out = np.empty_like(dist)
+    for i in prange(len(dist)):
+        out[i] = G * (gdp_o[i] * gdp_d[i]) / (dist[i] ** beta) * noise[i]
+    return out
+
 def create_synthetic_trade():
     print(f"Generating synthetic trade data ({YEAR})...")
     
     merged = distance_df.copy()
-    merged = merged.merge(gdp_df[['country_code', 'gdp']], 
-                         left_on='iso_o', right_on='country_code', how='left'
-                         ).rename(columns={'gdp': 'gdp_o'})
-    merged = merged.merge(gdp_df[['country_code', 'gdp']], 
-                         left_on='iso_d', right_on='country_code', how='left'
-                         ).rename(columns={'gdp': 'gdp_d'})
+    merged['gdp_o'] = merged['iso_o'].map(gdp_map)
+    merged['gdp_d'] = merged['iso_d'].map(gdp_map)
     merged = merged.dropna(subset=['gdp_o', 'gdp_d'])
     
     np.random.seed(42)
@@ -437,7 +569,10 @@ def create_synthetic_trade():
     beta = 1.0
     noise = np.random.lognormal(0, 0.5, len(merged))
     
-    merged['trade'] = G * (merged['gdp_o'] * merged['gdp_d']) / (merged['dist'] ** beta) * noise
+    merged['trade'] = _gravity(merged['gdp_o'].to_numpy(np.float64),
+                               merged['gdp_d'].to_numpy(np.float64),
+                               merged['dist'].to_numpy(np.float64),
+                               noise, G, beta)
     merged = merged[merged['trade'] > 0][['iso_o', 'iso_d', 'trade']].copy()
     
     print(f"Generated: {len(merged)} trade records")
@@ -456,37 +591,57 @@ print("\n" + "="*80)
 print("STEP 4: Fit Gravity Model")
 print("="*80)
 
-# Merge data
-full_df = trade_df.copy()
-full_df = full_df.merge(distance_df[['iso_o', 'iso_d', 'dist']], 
-                        on=['iso_o', 'iso_d'], how='left')
-full_df = full_df.merge(gdp_df[['country_code', 'gdp']], 
-                        left_on='iso_o', right_on='country_code', how='left'
-                        ).rename(columns={'gdp': 'gdp_o'})
-full_df = full_df.merge(gdp_df[['country_code', 'gdp']], 
-                        left_on='iso_d', right_on='country_code', how='left'
-                        ).rename(columns={'gdp': 'gdp_d'})
-full_df = full_df.dropna()
+# The prepared frame is cached and reused while it is newer than every input
+# it was built from (CEPII source, GDP cache, real or synthetic trade cache)
+design_params = {'year': YEAR, 'countries': ','.join(sorted(COUNTRIES))}
+inputs_mtime = max(
+    max((os.path.getmtime(p) for p in (CEPII_DATA, CEPII_PARQUET) if os.path.exists(p)), default=0.0),
+    cache_mtime('gdp', {'year': YEAR}),
+    cache_mtime('trade', design_params),
+    cache_mtime('trade', {'year': YEAR, 'synthetic': True}))
+
+full_df = None
+if cache_mtime('design', design_params) > inputs_mtime:
+    full_df = load_cache('design', params=design_params)
+
+if full_df is None:
+    # Attach distance and GDP by key lookup (one hash pass each, no merge)
+    full_df = trade_df.copy()
+    dist_map = distance_df.set_index(['iso_o', 'iso_d'])['dist']
+    full_df['dist'] = dist_map.reindex(
+        pd.MultiIndex.from_arrays([full_df['iso_o'], full_df['iso_d']])).to_numpy()
+    full_df['gdp_o'] = full_df['iso_o'].map(gdp_map)
+    full_df['gdp_d'] = full_df['iso_d'].map(gdp_map)
+    full_df = full_df.dropna()
+    
+    # Log transformation
+    logs = {f'log_{c}': np.log(full_df[c].to_numpy(np.float64))
+            for c in ['trade', 'gdp_o', 'gdp_d', 'dist']}
+    finite = np.logical_and.reduce([np.isfinite(v) for v in logs.values()])
+    full_df = full_df.assign(**logs).loc[finite]
+    save_cache(full_df, 'design', params=design_params)
 
 print(f"Merged dataset: {len(full_df)} valid records")
 
-# Log transformation
-full_df['log_trade'] = np.log(full_df['trade'])
-full_df['log_gdp_o'] = np.log(full_df['gdp_o'])
-full_df['log_gdp_d'] = np.log(full_df['gdp_d'])
-full_df['log_dist'] = np.log(full_df['dist'])
-full_df = full_df.replace([np.inf, -np.inf], np.nan).dropna()
+# Contiguous float64 snapshot of the model columns, shared by the fit, the bootstrap and the figure
+arrays = {c: full_df[c].to_numpy(dtype=np.float64)
+          for c in ['log_trade', 'log_gdp_o', 'log_gdp_d', 'log_dist', 'dist', 'trade']}
 
 # Linear regression
 X = np.column_stack([
     np.ones(len(full_df)),
-    full_df['log_gdp_o'],
-    full_df['log_gdp_d'],
-    full_df['log_dist']
+    arrays['log_gdp_o'],
+    arrays['log_gdp_d'],
+    arrays['log_dist']
 ])
-Y = full_df['log_trade'].values
-
-coeffs = np.linalg.lstsq(X, Y, rcond=None)[0]
+Y = arrays['log_trade']
+
+# 4x4 normal equations; X'X is symmetric positive definite, so one Cholesky
+# factor gives both the coefficients and XtX_inv for the standard errors
+XtX = X.T @ X
+XtX_chol = cho_factor(XtX, check_finite=False)
+coeffs = cho_solve(XtX_chol, X.T @ Y, check_finite=False)
+XtX_inv = cho_solve(XtX_chol, np.eye(X.shape[1]), check_finite=False)
 beta_dist = -coeffs[3]
 
 Y_pred = X @ coeffs
@@ -496,7 +651,7 @@ r_squared = 1 - ss_res/ss_tot
 
 n, k = len(full_df), X.shape[1]
 sigma_sq = ss_res / (n - k)
-var_beta = sigma_sq * np.linalg.inv(X.T @ X)
+var_beta = sigma_sq * XtX_inv
 se_beta = np.sqrt(var_beta[3, 3])
 
 print(f"\nGravity Model Results:")
@@ -528,21 +683,31 @@ print("\n" + "="*80)
 print("STEP 5: Create Publication Figure")
 print("="*80)
 
-df = results['df']
+# matplotlib is only needed from here on. The only early exit is the unset
+# COMTRADE_TOKEN check at the top, which no longer pays for this import;
+# download failures fall back to synthetic data and still reach this step
+import matplotlib.pyplot as plt
+
+# Set matplotlib to use English and proper fonts
+plt.rcParams['font.family'] = 'DejaVu Sans'
+plt.rcParams['font.size'] = 10
+plt.rcParams['axes.unicode_minus'] = False
+
 beta = results['beta']
 r_squared = results['r_squared']
 
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
 
 # Left panel: Trade vs Distance
-n_points = min(1000, len(df))
-df_sample = df.sample(n=n_points) if len(df) > n_points else df
+n_points = min(1000, n)
+sample = (np.random.default_rng(42).choice(n, n_points, replace=False)
+          if n > n_points else slice(None))
 
-ax1.scatter(df_sample['dist'], df_sample['trade']/1e9, 
+ax1.scatter(arrays['dist'][sample], arrays['trade'][sample]/1e9, 
            alpha=0.3, s=20, c='steelblue', label='Bilateral trade flows')
 
-dist_range = np.logspace(np.log10(df['dist'].min()), np.log10(df['dist'].max()), 100)
-mean_log_gdp = (df['log_gdp_o'].mean() + df['log_gdp_d'].mean()) / 2
+dist_range = np.logspace(np.log10(arrays['dist'].min()), np.log10(arrays['dist'].max()), 100)
+mean_log_gdp = (arrays['log_gdp_o'].mean() + arrays['log_gdp_d'].mean()) / 2
 log_trade_pred = (coeffs[0] + coeffs[1]*mean_log_gdp + 
                  coeffs[2]*mean_log_gdp + coeffs[3]*np.log(dist_range))
 trade_pred = np.exp(log_trade_pred) / 1e9
@@ -572,14 +737,25 @@ ax1.text(0.05, 0.05, textstr, transform=ax1.transAxes, fontsize=10,
 
 # Right panel: Bootstrap
 print("Running bootstrap analysis...")
-beta_bootstrap = []
-for _ in range(100):
-    sample = df.sample(n=len(df), replace=True)
-    X_boot = np.column_stack([np.ones(len(sample)), sample['log_gdp_o'],
-                              sample['log_gdp_d'], sample['log_dist']])
-    Y_boot = sample['log_trade'].values
-    coeffs_boot = np.linalg.lstsq(X_boot, Y_boot, rcond=None)[0]
-    beta_bootstrap.append(-coeffs_boot[3])
+# Resample rows of the Step 4 design matrix (same rows as full_df) by integer index;
+# each replicate is a 4x4 normal-equation solve
+X_full, Y_full = X, Y
+
+def one_boot(seed):
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, n)
+    X_boot, Y_boot = X_full[idx], Y_full[idx]
+    return -solve(X_boot.T @ X_boot, X_boot.T @ Y_boot, assume_a='pos', check_finite=False)[3]
+
+# One independent stream per replicate from a fixed root seed: the histogram
+# and CI are reproducible and do not depend on thread scheduling.
+# Threads rather than processes: each replicate is a tiny BLAS call that
+# releases the GIL, and worker start-up would cost more than the fits
+seeds = np.random.SeedSequence(42).spawn(100)
+if Parallel is not None:
+    beta_bootstrap = Parallel(n_jobs=-1, prefer='threads')(delayed(one_boot)(s) for s in seeds)
+else:
+    beta_bootstrap = [one_boot(s) for s in seeds]
 
 ax2.hist(beta_bootstrap, bins=30, density=True, alpha=0.7, 
         color='steelblue', edgecolor='black', linewidth=0.5)
@@ -4,92 +4,87 @@
 
 import numpy as np
 import pandas as pd
-from scipy import stats
+from scipy import special
+
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
 
 # ============================================
 # 三种交易方式
 # ============================================
 
+def _as_series(x):
+    return x.iloc[:, 0] if isinstance(x, pd.DataFrame) else x
+
+
+def _signal_positions(S, index_prices, S_threshold, horizon):
+    """
+    候选信号：前 len(S)-horizon 天中 S > 阈值、日期在指数中且 horizon 天后仍有价格
+    返回 (在 S 中的位置, 在 index_prices 中的位置)
+    """
+    n = max(len(S) - horizon, 0)
+    pos = index_prices.index.get_indexer(S.index[:n])
+    ok = (S.to_numpy(np.float64)[:n] > S_threshold) & (pos >= 0) & (pos + horizon < len(index_prices))
+    i = np.flatnonzero(ok)
+    return i, pos[i]
+
+
+@njit(cache=True)
+def _greedy_non_overlap(entry, exit_):
+    """
+    entry 升序：取第一个候选，之后跳到入场日晚于其出场日的下一个候选（二分查找）
+    返回选中的下标
+    """
+    keep = np.empty(len(entry), dtype=np.int64)
+    n = 0
+    k = 0
+    while k < len(entry):
+        keep[n] = k
+        n += 1
+        k = np.searchsorted(entry, exit_[k], side='right')
+    return keep[:n]
+
+
+def _non_overlapping(S, index_prices, i, pos, horizon):
+    """按时间顺序选取：入场日须晚于上一笔的出场日"""
+    entry = S.index[i].values.astype('datetime64[ns]').view('i8')
+    exit_ = index_prices.index[pos + horizon].values.astype('datetime64[ns]').view('i8')
+    keep = _greedy_non_overlap(entry, exit_)
+    return i[keep], pos[keep]
+
+
+def _trades_frame(S, index_prices, i, pos, horizon):
+    prices = index_prices.to_numpy(np.float64)
+    ret = np.log(prices[pos + horizon] / prices[pos])
+    return pd.DataFrame({
+        'entry_date': S.index[i],
+        'exit_date': index_prices.index[pos + horizon],
+        'S': S.to_numpy(np.float64)[i],
+        'return': ret,
+        'win': ret > 0
+    })
+
+
 def compute_trades_overlapping(S, index_prices, S_threshold, horizon=30):
     """
     重叠交易：每天信号触发都算一次
     """
-    if isinstance(S, pd.DataFrame):
-        S = S.iloc[:, 0]
-    if isinstance(index_prices, pd.DataFrame):
-        index_prices = index_prices.iloc[:, 0]
-    
-    trades = []
-    
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        S_value = S.iloc[t]
-        
-        if S_value > S_threshold:
-            if date in index_prices.index:
-                try:
-                    idx = index_prices.index.get_loc(date)
-                    if idx + horizon < len(index_prices):
-                        entry_price = float(index_prices.iloc[idx])
-                        exit_price = float(index_prices.iloc[idx + horizon])
-                        ret = np.log(exit_price / entry_price)
-                        
-                        trades.append({
-                            'entry_date': date,
-                            'exit_date': index_prices.index[idx + horizon],
-                            'S': S_value,
-                            'return': ret,
-                            'win': ret > 0
-                        })
-                except:
-                    pass
-    
-    return pd.DataFrame(trades)
+    S, index_prices = _as_series(S), _as_series(index_prices)
+    i, pos = _signal_positions(S, index_prices, S_threshold, horizon)
+    return _trades_frame(S, index_prices, i, pos, horizon)
 
 
 def compute_trades_non_overlapping(S, index_prices, S_threshold, horizon=30):
     """
     不重叠交易：必须等上一笔结束才能开下一笔
     """
-    if isinstance(S, pd.DataFrame):
-        S = S.iloc[:, 0]
-    if isinstance(index_prices, pd.DataFrame):
-        index_prices = index_prices.iloc[:, 0]
-    
-    trades = []
-    last_exit_date = None
-    
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        S_value = S.iloc[t]
-        
-        # 如果还在持仓期内，跳过
-        if last_exit_date is not None and date <= last_exit_date:
-            continue
-        
-        if S_value > S_threshold:
-            if date in index_prices.index:
-                try:
-                    idx = index_prices.index.get_loc(date)
-                    if idx + horizon < len(index_prices):
-                        entry_price = float(index_prices.iloc[idx])
-                        exit_price = float(index_prices.iloc[idx + horizon])
-                        ret = np.log(exit_price / entry_price)
-                        exit_date = index_prices.index[idx + horizon]
-                        
-                        trades.append({
-                            'entry_date': date,
-                            'exit_date': exit_date,
-                            'S': S_value,
-                            'return': ret,
-                            'win': ret > 0
-                        })
-                        
-                        last_exit_date = exit_date  # 更新最后退出日期
-                except:
-                    pass
-    
-    return pd.DataFrame(trades)
+    S, index_prices = _as_series(S), _as_series(index_prices)
+    i, pos = _signal_positions(S, index_prices, S_threshold, horizon)
+    i, pos = _non_overlapping(S, index_prices, i, pos, horizon)
+    return _trades_frame(S, index_prices, i, pos, horizon)
 
 
 def compute_trades_weekly(S, index_prices, S_threshold, horizon=30, check_day=0):
@@ -98,50 +93,13 @@ def compute_trades_weekly(S, index_prices, S_threshold, horizon=30, check_day=0)
     
     check_day: 0=周一, 1=周二, ..., 4=周五
     """
-    if isinstance(S, pd.DataFrame):
-        S = S.iloc[:, 0]
-    if isinstance(index_prices, pd.DataFrame):
-        index_prices = index_prices.iloc[:, 0]
-    
-    trades = []
-    last_exit_date = None
-    
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        
-        # 只在指定的星期几检查
-        if date.dayofweek != check_day:
-            continue
-        
-        # 如果还在持仓期内，跳过
-        if last_exit_date is not None and date <= last_exit_date:
-            continue
-        
-        S_value = S.iloc[t]
-        
-        if S_value > S_threshold:
-            if date in index_prices.index:
-                try:
-                    idx = index_prices.index.get_loc(date)
-                    if idx + horizon < len(index_prices):
-                        entry_price = float(index_prices.iloc[idx])
-                        exit_price = float(index_prices.iloc[idx + horizon])
-                        ret = np.log(exit_price / entry_price)
-                        exit_date = index_prices.index[idx + horizon]
-                        
-                        trades.append({
-                            'entry_date': date,
-                            'exit_date': exit_date,
-                            'S': S_value,
-                            'return': ret,
-                            'win': ret > 0
-                        })
-                        
-                        last_exit_date = exit_date
-                except:
-                    pass
+    S, index_prices = _as_series(S), _as_series(index_prices)
+    i, pos = _signal_positions(S, index_prices, S_threshold, horizon)
     
-    return pd.DataFrame(trades)
+    # 只在指定的星期几检查
+    on_day = S.index[i].dayofweek == check_day
+    i, pos = _non_overlapping(S, index_prices, i[on_day], pos[on_day], horizon)
+    return _trades_frame(S, index_prices, i, pos, horizon)
 
 
 # ============================================
@@ -160,13 +118,13 @@ def statistical_analysis(trades_df, name):
     mean_ret = np.mean(returns)
     std_ret = np.std(returns, ddof=1) if n > 1 else 0
     
-    # 胜率检验
-    p_winrate = 1 - stats.binom.cdf(n_wins - 1, n, 0.5) if n > 0 else 1
+    # 胜率检验：P(X >= n_wins)，X ~ Binom(n, 0.5)，即正则化不完全 Beta 函数
+    p_winrate = special.betainc(n_wins, n - n_wins + 1, 0.5) if n_wins > 0 else 1
     
-    # 收益 t 检验
+    # 收益 t 检验（单侧，H1: 均值 > 0）
     if n > 1 and std_ret > 0:
-        t_stat, p_two = stats.ttest_1samp(returns, 0)
-        p_return = p_two / 2 if t_stat > 0 else 1
+        t_stat = mean_ret / (std_ret / np.sqrt(n))
+        p_return = special.stdtr(n - 1, -t_stat) if t_stat > 0 else 1
     else:
         t_stat, p_return = 0, 1
     
@@ -7,9 +7,18 @@ import pandas as pd
 import yfinance as yf
 import time
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
 import warnings
+from _cache_io import read_cached_csv
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ============================================
 # 参数设置
 # ============================================
@@ -18,6 +27,7 @@ START_DATE = '2010-01-01'
 TRAIN_END = '2020-01-01'
 WINDOW = 60
 HORIZON = 30
+DOWNLOAD_WORKERS = 4   # 并发下载的批数
 
 # ============================================
 # 三个市场的股票池
@@ -70,6 +80,19 @@ MARKETS = {
 # 数据加载函数
 # ============================================
 
+def download_close(batch, retries=3):
+    """下载一批股票的收盘价；失败时按 3s、6s、12s（加随机抖动）退避重试"""
+    for attempt in range(retries):
+        # 并发请求前的随机抖动，避免同时打到 Yahoo 触发限流
+        time.sleep(random.uniform(0, 1))
+        try:
+            data = yf.download(batch, start=START_DATE, progress=False, threads=False)
+            return data['Close'] if not data.empty else None
+        except Exception as e:
+            print(f"    错误 {batch}: {e}")
+            time.sleep(3 * 2**attempt)
+    return None
+
 def load_market_data(market_key, force_download=False):
     """加载某个市场的数据"""
     market = MARKETS[market_key]
@@ -77,54 +100,52 @@ def load_market_data(market_key, force_download=False):
     stock_file = f'stocks_{market_key}.csv'
     index_file = f'index_{market_key}.csv'
     
+    need_index = force_download or not os.path.exists(index_file)
+    index = None
+    
     # 加载股票数据
     if os.path.exists(stock_file) and not force_download:
         print(f"从本地加载: {stock_file}")
-        prices = pd.read_csv(stock_file, index_col=0, parse_dates=True)
+        prices = read_cached_csv(stock_file)
     else:
         print(f"下载 {market['name']} 股票...")
-        all_data = []
+        tickers = market['tickers']
         batch_size = 10
+        batches = [tickers[i:i+batch_size] for i in range(0, len(tickers), batch_size)]
+        if need_index:
+            batches[0] = [market['index']] + batches[0]   # 指数随第一批一起下载，省去单独请求
+        print(f"  并发下载 {len(batches)} 批（每批 {batch_size} 只）...")
         
-        for i in range(0, len(market['tickers']), batch_size):
-            batch = market['tickers'][i:i+batch_size]
-            print(f"  下载 {i+1}-{min(i+batch_size, len(market['tickers']))}...")
-            try:
-                data = yf.download(batch, start=START_DATE, progress=False)
-                if not data.empty:
-                    if 'Close' in data.columns:
-                        all_data.append(data['Close'])
-                    elif isinstance(data.columns, pd.MultiIndex):
-                        all_data.append(data['Close'])
-                time.sleep(1)
-            except Exception as e:
-                print(f"    错误: {e}")
-                time.sleep(3)
+        # 网络 IO 为主，多批请求并发发出
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as ex:
+            all_data = [d for d in ex.map(download_close, batches) if d is not None]
         
         if all_data:
             prices = pd.concat(all_data, axis=1) if len(all_data) > 1 else all_data[0]
+            if market['index'] in prices.columns:
+                # 拆出指数列；去掉只有指数有报价的日期
+                index = prices.pop(market['index']).dropna()
+                prices = prices.dropna(how='all')
+                index.to_csv(index_file)
+                print(f"  已保存: {index_file}")
             prices.to_csv(stock_file)
             print(f"  已保存: {stock_file}")
         else:
             return None, None
     
-    # 加载指数数据
-    if os.path.exists(index_file) and not force_download:
-        print(f"从本地加载: {index_file}")
-        index = pd.read_csv(index_file, index_col=0, parse_dates=True).iloc[:, 0]
-    else:
-        print(f"下载 {market['name']} 指数...")
-        time.sleep(2)
-        try:
-            data = yf.download(market['index'], start=START_DATE, progress=False)
-            index = data['Close']
-            if isinstance(index, pd.DataFrame):
-                index = index.iloc[:, 0]
+    # 加载指数数据（未随股票一起下载时）
+    if index is None:
+        if not need_index:
+            print(f"从本地加载: {index_file}")
+            index = read_cached_csv(index_file).iloc[:, 0]
+        else:
+            print(f"下载 {market['name']} 指数...")
+            data = download_close([market['index']])
+            if data is None:
+                return prices, None
+            index = data.iloc[:, 0] if isinstance(data, pd.DataFrame) else data
             index.to_csv(index_file)
             print(f"  已保存: {index_file}")
-        except Exception as e:
-            print(f"  错误: {e}")
-            return prices, None
     
     # 清理数据
     if prices is not None:
@@ -137,49 +158,96 @@ def load_market_data(market_key, force_download=False):
 # ============================================
 
 def compute_returns(prices):
-    return np.log(prices / prices.shift(1)).dropna()
+    # 直接在数组上计算对数收益，丢弃含 NaN 的行（等价于 shift + dropna）
+    A = prices.to_numpy(np.float64)
+    R = np.log(A[1:] / A[:-1])
+    keep = ~np.isnan(R).any(axis=1)
+    return pd.DataFrame(R[keep], index=prices.index[1:][keep], columns=prices.columns)
 
-def compute_entanglement_entropy(returns, window=60):
-    S_list = []
-    dates = []
-    N = returns.shape[1]
-    
-    for t in range(window, len(returns)):
-        window_returns = returns.iloc[t-window:t]
-        Sigma = window_returns.corr().values
-        Sigma = Sigma + np.eye(N) * 1e-6
-        det_Sigma = np.linalg.det(Sigma)
-        
-        if det_Sigma > 0:
-            S = -np.log(det_Sigma) / N
-        else:
-            S = np.nan
+@njit(cache=True)
+def _entropy_kernel(R, window, degenerate):
+    """滚动窗口纠缠熵的主循环（R: T×N float64 收益；degenerate: 跳过的窗口）"""
+    T, N = R.shape
+    ridge = np.eye(N) * 1e-6
+    S_values = np.full(len(degenerate), np.nan)
+    
+    # 窗口 R[t-window:t] 的列和与叉积和：每步加入一行、移出一行，O(N²) 更新
+    Sx = R[:window].sum(axis=0)
+    Sxy = R[:window].T @ R[:window]
+    
+    for t in range(window, T):
+        if not degenerate[t - window]:
+            cov = Sxy / window - np.outer(Sx, Sx) / window**2
+            d = np.sqrt(np.diag(cov))
+            Sigma = cov / np.outer(d, d) + ridge
+            # Sigma 对称正定：log det = 2 Σ log diag(L)；Cholesky 失败时退回 slogdet
+            try:
+                L = np.linalg.cholesky(Sigma)
+                S_values[t - window] = -2.0 * np.log(np.diag(L)).sum() / N
+            except Exception:
+                sign, logdet = np.linalg.slogdet(Sigma)
+                if sign > 0:
+                    S_values[t - window] = -logdet / N
         
-        S_list.append(S)
-        dates.append(returns.index[t])
+        inc = R[t]
+        out = R[t - window]
+        Sx += inc - out
+        Sxy += np.outer(inc, inc) - np.outer(out, out)
     
-    return pd.Series(S_list, index=dates)
+    return S_values
+
+def compute_entanglement_entropy(returns, window=60):
+    R = np.ascontiguousarray(returns.to_numpy(np.float64))
+    T, N = R.shape
+    n_out = max(T - window, 0)
+    
+    # 窗口内收益全为 0 的股票（停牌/前向填充）方差为 0，相关系数无定义 → S 记为 NaN
+    nz = np.vstack([np.zeros((1, N), dtype=np.int64), np.cumsum(R != 0, axis=0)])
+    degenerate = ((nz[window:window + n_out] - nz[:n_out]) == 0).any(axis=1)
+    
+    S_values = _entropy_kernel(R, window, degenerate) if n_out > 0 else np.full(0, np.nan)
+    return pd.Series(S_values, index=returns.index[window:])
+
+def _sig(path):
+    """文件签名（大小-修改时间），作为派生缓存的键"""
+    st = os.stat(path)
+    return f"{st.st_size}-{int(st.st_mtime)}"
+
+def cached_entropy(market_key, prices, window=60):
+    """
+    纠缠熵按股票文件签名和窗口缓存为 .npy；股票数据重新下载或窗口改变时重新计算
+    """
+    returns = compute_returns(prices)
+    cache_file = f'entropy_{market_key}_{_sig(f"stocks_{market_key}.csv")}_{window}.npy'
+    
+    if os.path.exists(cache_file):
+        print(f"从本地加载纠缠熵: {cache_file}")
+        values = np.load(cache_file)
+    else:
+        print("计算纠缠熵...")
+        values = compute_entanglement_entropy(returns, window=window).to_numpy()
+        np.save(cache_file, values)
+    
+    return pd.Series(values, index=returns.index[window:])
 
 def test_strategy(S, index, threshold, horizon=30):
     """测试策略效果"""
-    results = []
+    # 前 len(S)-horizon 天中 S > 阈值、日期在指数中且 horizon 天后仍有价格
+    n = max(len(S) - horizon, 0)
+    pos = index.index.get_indexer(S.index[:n])
+    values = S.to_numpy(np.float64)[:n]
+    t = np.flatnonzero((values > threshold) & (pos >= 0) & (pos + horizon < len(index)))
+    if len(t) == 0:
+        return None
     
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        value = S.iloc[t]
-        
-        if value > threshold and date in index.index:
-            idx = index.index.get_loc(date)
-            if idx + horizon < len(index):
-                ret = np.log(index.iloc[idx + horizon] / index.iloc[idx])
-                results.append({
-                    'date': date,
-                    'S': value,
-                    'return': ret,
-                    'win': ret > 0
-                })
-    
-    return pd.DataFrame(results) if results else None
+    prices = index.to_numpy(np.float64)
+    ret = np.log(prices[pos[t] + horizon] / prices[pos[t]])
+    return pd.DataFrame({
+        'date': S.index[t],
+        'S': values[t],
+        'return': ret,
+        'win': ret > 0
+    })
 
 # ============================================
 # 验证单个市场
@@ -206,9 +274,7 @@ def validate_market(market_key):
     print(f"\n有效数据: {len(prices.columns)} 只股票, {len(prices)} 天")
     
     # 计算纠缠熵
-    print("计算纠缠熵...")
-    returns = compute_returns(prices)
-    S = compute_entanglement_entropy(returns, window=WINDOW)
+    S = cached_entropy(market_key, prices, window=WINDOW)
     
     # 保存
     S.to_csv(f'entropy_{market_key}.csv')
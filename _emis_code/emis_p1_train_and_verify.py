@@ -8,8 +8,15 @@ import yfinance as yf
 import time
 import os
 import warnings
+from _cache_io import read_cached_csv
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ============================================
 # 参数设置（放在最前面！）
 # ============================================
@@ -44,7 +51,7 @@ def load_or_download_stocks(tickers, start_date, cache_file='stocks_50.csv'):
     """加载或下载股票数据"""
     if os.path.exists(cache_file):
         print(f"从本地加载: {cache_file}")
-        prices = pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        prices = read_cached_csv(cache_file)
         print(f"加载成功: {len(prices.columns)} 只股票, {len(prices)} 天")
         return prices
     
@@ -79,7 +86,7 @@ def load_or_download_sp500(start_date, cache_file='sp500.csv'):
     """加载或下载 S&P 500"""
     if os.path.exists(cache_file):
         print(f"从本地加载: {cache_file}")
-        sp500 = pd.read_csv(cache_file, index_col=0, parse_dates=True).iloc[:, 0]
+        sp500 = read_cached_csv(cache_file).iloc[:, 0]
         return sp500
     
     print("下载 S&P 500...")
@@ -107,49 +114,69 @@ def compute_returns(prices):
     """计算对数收益率"""
     return np.log(prices / prices.shift(1)).dropna()
 
+@njit(cache=True)
+def _entropy_kernel(R, window, degenerate):
+    """滚动窗口纠缠熵的主循环（R: T×N float64 收益；degenerate: 跳过的窗口）"""
+    T, N = R.shape
+    ridge = np.eye(N) * 1e-6
+    S_values = np.full(len(degenerate), np.nan)
+    
+    # 窗口 R[t-window:t] 的列和与叉积和：每步加入一行、移出一行，O(N²) 更新
+    Sx = R[:window].sum(axis=0)
+    Sxy = R[:window].T @ R[:window]
+    
+    for t in range(window, T):
+        if not degenerate[t - window]:
+            cov = Sxy / window - np.outer(Sx, Sx) / window**2
+            d = np.sqrt(np.diag(cov))
+            Sigma = cov / np.outer(d, d) + ridge
+            # Sigma 对称正定：log det = 2 Σ log diag(L)；Cholesky 失败时退回 slogdet
+            try:
+                L = np.linalg.cholesky(Sigma)
+                S_values[t - window] = -2.0 * np.log(np.diag(L)).sum() / N
+            except Exception:
+                sign, logdet = np.linalg.slogdet(Sigma)
+                if sign > 0:
+                    S_values[t - window] = -logdet / N
+        
+        inc = R[t]
+        out = R[t - window]
+        Sx += inc - out
+        Sxy += np.outer(inc, inc) - np.outer(out, out)
+    
+    return S_values
+
 def compute_entanglement_entropy(returns, window=60):
     """计算纠缠熵"""
-    S_list = []
-    dates = []
-    N = returns.shape[1]
+    R = np.ascontiguousarray(returns.to_numpy(np.float64))
+    T, N = R.shape
+    n_out = max(T - window, 0)
     
-    for t in range(window, len(returns)):
-        window_returns = returns.iloc[t-window:t]
-        Sigma = window_returns.corr().values
-        Sigma = Sigma + np.eye(N) * 1e-6
-        det_Sigma = np.linalg.det(Sigma)
-        
-        if det_Sigma > 0:
-            S = -np.log(det_Sigma) / N
-        else:
-            S = np.nan
-        
-        S_list.append(S)
-        dates.append(returns.index[t])
+    # 窗口内收益全为 0 的股票（停牌/前向填充）方差为 0，相关系数无定义 → S 记为 NaN
+    nz = np.vstack([np.zeros((1, N), dtype=np.int64), np.cumsum(R != 0, axis=0)])
+    degenerate = ((nz[window:window + n_out] - nz[:n_out]) == 0).any(axis=1)
     
-    return pd.Series(S_list, index=dates)
+    S_values = _entropy_kernel(R, window, degenerate) if n_out > 0 else np.full(0, np.nan)
+    return pd.Series(S_values, index=returns.index[window:])
 
 def test_strategy(S, sp500, S_threshold, horizon=30):
     """测试策略"""
-    results = []
-    
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        S_value = S.iloc[t]
-        
-        if S_value > S_threshold:
-            if date in sp500.index:
-                idx = sp500.index.get_loc(date)
-                if idx + horizon < len(sp500):
-                    ret = np.log(sp500.iloc[idx + horizon] / sp500.iloc[idx])
-                    results.append({
-                        'date': date,
-                        'S': S_value,
-                        'return': ret,
-                        'win': ret > 0
-                    })
+    # 前 len(S)-horizon 天中 S > 阈值、日期在 sp500 中且 horizon 天后仍有价格
+    n = max(len(S) - horizon, 0)
+    pos = sp500.index.get_indexer(S.index[:n])
+    values = S.to_numpy(np.float64)[:n]
+    t = np.flatnonzero((values > S_threshold) & (pos >= 0) & (pos + horizon < len(sp500)))
+    if len(t) == 0:
+        return None
     
-    return pd.DataFrame(results) if results else None
+    prices = sp500.to_numpy(np.float64)
+    ret = np.log(prices[pos[t] + horizon] / prices[pos[t]])
+    return pd.DataFrame({
+        'date': S.index[t],
+        'S': values[t],
+        'return': ret,
+        'win': ret > 0
+    })
 
 # ============================================
 # 主程序
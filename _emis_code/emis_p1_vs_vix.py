@@ -8,8 +8,15 @@ import yfinance as yf
 import time
 import os
 import warnings
+from _cache_io import read_cached_csv
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ============================================
 # 参数设置
 # ============================================
@@ -42,7 +49,7 @@ def load_stock_data():
     
     if os.path.exists(cache_file):
         print(f"从本地加载: {cache_file}")
-        prices = pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        prices = read_cached_csv(cache_file)
     else:
         print("下载股票数据...")
         prices = yf.download(TICKERS, start=START_DATE, progress=False)['Close']
@@ -58,7 +65,7 @@ def load_sp500():
     
     if os.path.exists(cache_file):
         print(f"从本地加载: {cache_file}")
-        sp500 = pd.read_csv(cache_file, index_col=0, parse_dates=True).iloc[:, 0]
+        sp500 = read_cached_csv(cache_file).iloc[:, 0]
     else:
         print("下载 S&P 500...")
         data = yf.download('^GSPC', start=START_DATE, progress=False)['Close']
@@ -76,7 +83,7 @@ def load_vix():
     
     if os.path.exists(cache_file):
         print(f"从本地加载: {cache_file}")
-        vix = pd.read_csv(cache_file, index_col=0, parse_dates=True).iloc[:, 0]
+        vix = read_cached_csv(cache_file).iloc[:, 0]
     else:
         print("下载 VIX...")
         time.sleep(2)
@@ -96,49 +103,78 @@ def load_vix():
 def compute_returns(prices):
     return np.log(prices / prices.shift(1)).dropna()
 
+@njit(cache=True)
+def _entropy_kernel(R, window, degenerate):
+    """滚动窗口纠缠熵的主循环（R: T×N float64 收益；degenerate: 跳过的窗口）"""
+    T, N = R.shape
+    ridge = np.eye(N) * 1e-6
+    S_values = np.full(len(degenerate), np.nan)
+    
+    # 窗口 R[t-window:t] 的列和与叉积和：每步加入一行、移出一行，O(N²) 更新
+    Sx = R[:window].sum(axis=0)
+    Sxy = R[:window].T @ R[:window]
+    
+    for t in range(window, T):
+        if not degenerate[t - window]:
+            cov = Sxy / window - np.outer(Sx, Sx) / window**2
+            d = np.sqrt(np.diag(cov))
+            Sigma = cov / np.outer(d, d) + ridge
+            # Sigma 对称正定：log det = 2 Σ log diag(L)；Cholesky 失败时退回 slogdet
+            try:
+                L = np.linalg.cholesky(Sigma)
+                S_values[t - window] = -2.0 * np.log(np.diag(L)).sum() / N
+            except Exception:
+                sign, logdet = np.linalg.slogdet(Sigma)
+                if sign > 0:
+                    S_values[t - window] = -logdet / N
+        
+        inc = R[t]
+        out = R[t - window]
+        Sx += inc - out
+        Sxy += np.outer(inc, inc) - np.outer(out, out)
+    
+    return S_values
+
 def compute_entanglement_entropy(returns, window=60):
     """计算纠缠熵"""
-    S_list = []
-    dates = []
-    N = returns.shape[1]
-    
-    for t in range(window, len(returns)):
-        window_returns = returns.iloc[t-window:t]
-        Sigma = window_returns.corr().values
-        Sigma = Sigma + np.eye(N) * 1e-6
-        det_Sigma = np.linalg.det(Sigma)
-        
-        if det_Sigma > 0:
-            S = -np.log(det_Sigma) / N
-        else:
-            S = np.nan
-        
-        S_list.append(S)
-        dates.append(returns.index[t])
+    R = np.ascontiguousarray(returns.to_numpy(np.float64))
+    T, N = R.shape
+    n_out = max(T - window, 0)
     
-    return pd.Series(S_list, index=dates, name='S')
+    # 窗口内收益全为 0 的股票（停牌/前向填充）方差为 0，相关系数无定义 → S 记为 NaN
+    nz = np.vstack([np.zeros((1, N), dtype=np.int64), np.cumsum(R != 0, axis=0)])
+    degenerate = ((nz[window:window + n_out] - nz[:n_out]) == 0).any(axis=1)
+    
+    S_values = _entropy_kernel(R, window, degenerate) if n_out > 0 else np.full(0, np.nan)
+    return pd.Series(S_values, index=returns.index[window:], name='S')
+
+def forward_returns(indicator, sp500, horizon=30):
+    """
+    indicator 前 len-horizon 天逐日入场、持有 horizon 天的对数收益
+    返回 (收益, 可交易掩码)：日期须在 sp500 中且 horizon 天后仍有价格；与阈值无关，可复用
+    """
+    n = max(len(indicator) - horizon, 0)
+    pos = sp500.index.get_indexer(indicator.index[:n])
+    ok = (pos >= 0) & (pos + horizon < len(sp500))
+    prices = sp500.to_numpy(np.float64)
+    ret = np.full(n, np.nan)
+    ret[ok] = np.log(prices[pos[ok] + horizon] / prices[pos[ok]])
+    return ret, ok
 
 def test_indicator(indicator, sp500, threshold, horizon=30):
     """测试指标效果"""
-    results = []
-    
-    for t in range(len(indicator) - horizon):
-        date = indicator.index[t]
-        value = indicator.iloc[t]
-        
-        if value > threshold:
-            if date in sp500.index:
-                idx = sp500.index.get_loc(date)
-                if idx + horizon < len(sp500):
-                    ret = np.log(sp500.iloc[idx + horizon] / sp500.iloc[idx])
-                    results.append({
-                        'date': date,
-                        'value': value,
-                        'return': ret,
-                        'win': ret > 0
-                    })
-    
-    return pd.DataFrame(results) if results else None
+    ret, ok = forward_returns(indicator, sp500, horizon)
+    values = indicator.to_numpy(np.float64)[:len(ret)]
+    t = np.flatnonzero((values > threshold) & ok)
+    if len(t) == 0:
+        return None
+    
+    return pd.DataFrame({
+        'date': indicator.index[t],
+        'value': values[t],
+        'return': ret[t],
+        'win': ret[t] > 0
+    })
 
 # ============================================
 # 主程序
@@ -231,17 +267,23 @@ def main():
     print(f"\n{'阈值':<12} {'EMIS胜率':<12} {'EMIS收益':<12} {'VIX胜率':<12} {'VIX收益':<12}")
     print("-"*60)
     
+    # 前瞻收益只依赖日期和 HORIZON，各阈值共用；每个阈值只需一次布尔掩码
+    s_fut, s_ok = forward_returns(S_test, sp500_test, HORIZON)
+    v_fut, v_ok = forward_returns(vix_test, sp500_test, HORIZON)
+    s_vals = S_test.to_numpy(np.float64)[:len(s_fut)]
+    v_vals = vix_test.to_numpy(np.float64)[:len(v_fut)]
+    
     for pct in [80, 85, 90, 95]:
         s_th = S_train.quantile(pct/100)
         v_th = vix_train.quantile(pct/100)
         
-        s_res = test_indicator(S_test, sp500_test, s_th, HORIZON)
-        v_res = test_indicator(vix_test, sp500_test, v_th, HORIZON)
+        s_hit = s_fut[(s_vals > s_th) & s_ok]
+        v_hit = v_fut[(v_vals > v_th) & v_ok]
         
-        s_wr = s_res['win'].mean() if s_res is not None and len(s_res) > 0 else 0
-        s_ret = s_res['return'].mean() if s_res is not None and len(s_res) > 0 else 0
-        v_wr = v_res['win'].mean() if v_res is not None and len(v_res) > 0 else 0
-        v_ret = v_res['return'].mean() if v_res is not None and len(v_res) > 0 else 0
+        s_wr = (s_hit > 0).mean() if len(s_hit) > 0 else 0
+        s_ret = np.nanmean(s_hit) if len(s_hit) > 0 else 0
+        v_wr = (v_hit > 0).mean() if len(v_hit) > 0 else 0
+        v_ret = np.nanmean(v_hit) if len(v_hit) > 0 else 0
         
         print(f"{pct}%分位      {s_wr:<12.1%} {s_ret:<12.1%} {v_wr:<12.1%} {v_ret:<12.1%}")
     
@@ -250,23 +292,14 @@ def main():
     print("组合策略: EMIS + VIX 双重确认")
     print("="*60)
     
-    combo_results = []
-    for t in range(len(S_test) - HORIZON):
-        date = S_test.index[t]
-        s_val = S_test.iloc[t]
-        
-        if date in vix_test.index:
-            v_val = vix_test.loc[date]
-            
-            if s_val > S_threshold and v_val > vix_threshold:
-                if date in sp500_test.index:
-                    idx = sp500_test.index.get_loc(date)
-                    if idx + HORIZON < len(sp500_test):
-                        ret = np.log(sp500_test.iloc[idx + HORIZON] / sp500_test.iloc[idx])
-                        combo_results.append({'return': ret, 'win': ret > 0})
-    
-    if len(combo_results) > 0:
-        df_combo = pd.DataFrame(combo_results)
+    # 两个指标同时超过阈值（复用上面 EMIS 的前瞻收益）
+    both = (s_vals > S_threshold) & \
+           (vix_test.reindex(S_test.index[:len(s_fut)]).to_numpy(np.float64) > vix_threshold)
+    t = np.flatnonzero(both & s_ok)
+    
+    if len(t) > 0:
+        ret = s_fut[t]
+        df_combo = pd.DataFrame({'return': ret, 'win': ret > 0})
         print(f"\n触发次数: {len(df_combo)}")
         print(f"胜率: {df_combo['win'].mean():.1%}")
         print(f"平均收益: {df_combo['return'].mean():.1%}")
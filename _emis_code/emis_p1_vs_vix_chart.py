@@ -134,25 +134,24 @@ print("图3 已保存")
 
 def compute_cumulative_returns(indicator, sp500, threshold, horizon=30):
     """计算累计收益"""
-    cum_ret = [0]
-    dates = [indicator.index[0]]
+    # 候选入场：前 len(indicator)-horizon 天中超过阈值、且 horizon 天后仍有价格
+    n = max(len(indicator) - horizon, 0)
+    pos = sp500.index.get_indexer(indicator.index[:n])
+    ok = (indicator.to_numpy(np.float64)[:n] > threshold) & (pos >= 0) & (pos + horizon < len(sp500))
+    cand = np.flatnonzero(ok)
     
-    t = 0
-    while t < len(indicator) - horizon:
-        date = indicator.index[t]
-        value = indicator.iloc[t]
-        
-        if value > threshold:
-            if date in sp500.index:
-                idx = sp500.index.get_loc(date)
-                if idx + horizon < len(sp500):
-                    ret = np.log(sp500.iloc[idx + horizon] / sp500.iloc[idx])
-                    cum_ret.append(cum_ret[-1] + ret)
-                    dates.append(sp500.index[idx + horizon])
-                    t += horizon  # 跳过持有期
-                    continue
-        t += 1
+    # 入场后跳过持有期：下一笔取位置 >= 上一笔 + horizon 的第一个候选
+    keep = []
+    k = 0
+    while k < len(cand):
+        keep.append(k)
+        k = np.searchsorted(cand, cand[k] + horizon)
+    p = pos[cand[keep]]
     
+    prices = sp500.to_numpy(np.float64)
+    ret = np.log(prices[p + horizon] / prices[p])
+    cum_ret = np.concatenate([[0], np.cumsum(ret)])
+    dates = indicator.index[:1].append(sp500.index[p + horizon])
     return pd.Series(cum_ret, index=dates)
 
 # 只看测试集
@@ -6,10 +6,15 @@ Figure 3: 跨市场对比
 """
 
 import os
+import hashlib
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib import cbook
+from matplotlib.collections import PolyCollection
 from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
@@ -23,6 +28,10 @@ PROJECT_DIR     = './_emis_code/p1-entanglement-entropy/'
 CACHE_DIR       = os.path.join(PROJECT_DIR, 'cache')
 DATA_FIGURE_DIR = os.path.join(PROJECT_DIR, 'data-figure')
 
+# 交易收益缓存（parquet）；计算逻辑变化时递增版本号使旧缓存失效
+TRADES_CACHE_DIR = os.path.join(CACHE_DIR, 'trades')
+TRADES_CACHE_VERSION = 1
+
 # 缓存文件
 US_INDEX_CACHE = os.path.join(CACHE_DIR,'sp500.csv')
 US_ENTROPY_CACHE = os.path.join(CACHE_DIR,'entropy_US_since2005.csv')  
@@ -46,6 +55,17 @@ plt.rcParams['figure.dpi'] = 150
 plt.rcParams['savefig.dpi'] = 300
 plt.rcParams['figure.figsize'] = (10, 8)
 
+# 密集折线的渲染: 合并 1 像素内的共线线段，分块绘制长路径
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# PNG 输出: zlib 3 级压缩（编码约快 1.7 倍，文件约大 30%；PDF 为出版用版本）
+PNG_KWARGS = {'compress_level': 3, 'optimize': False}
+
+# 时间序列折线最多保留的点数（LTTB 降采样）
+PLOT_POINTS = 2000
+
 # ============================================
 # 读取数据
 # ============================================
@@ -81,35 +101,137 @@ def load_data():
     
     return data
 
+# (市场, 训练截止日, 分位) → 阈值; Figure 1-3 共用，每个市场只算一次
+_THRESHOLDS = {}
+
+def train_threshold(data, market, train_end, q=0.90):
+    """训练期纠缠熵的 q 分位数阈值（np.quantile 内部为 O(N) 选择，结果同 Series.quantile）"""
+    key = (market, train_end, q)
+    if key not in _THRESHOLDS:
+        S = data[market]['entropy']
+        S_train = S.to_numpy(np.float64)[S.index < train_end]
+        _THRESHOLDS[key] = np.quantile(S_train[~np.isnan(S_train)], q)
+    return _THRESHOLDS[key]
+
 def compute_trade_returns(S, index_prices, S_threshold, horizon=30):
     """计算交易收益"""
-    trades = []
-    
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        S_value = S.iloc[t]
-        
-        if date in index_prices.index:
-            try:
-                idx = index_prices.index.get_loc(date)
-                if idx + horizon < len(index_prices):
-                    ret = np.log(float(index_prices.iloc[idx + horizon]) / 
-                                float(index_prices.iloc[idx]))
-                    trades.append({
-                        'date': date,
-                        'S': S_value,
-                        'return': ret,
-                        'signal': S_value > S_threshold
-                    })
-            except:
-                pass
-    
-    return pd.DataFrame(trades)
+    # S 末尾 horizon 天不参与
+    S = S.iloc[:max(len(S) - horizon, 0)]
+    
+    # 在指数日期（int64 纳秒）上二分查找 S 的日期，只保留精确命中的交易日
+    price_times = index_prices.index.values.astype('datetime64[ns]').view('i8')
+    price_vals = index_prices.to_numpy(np.float64)
+    s_times = S.index.values.astype('datetime64[ns]').view('i8')
+    pos = np.searchsorted(price_times, s_times)
+    
+    hit = pos < len(price_times)
+    hit[hit] = price_times[pos[hit]] == s_times[hit]
+    valid = hit & (pos + horizon < len(price_times))
+    
+    # horizon 个指数交易日后的对数收益
+    p = pos[valid]
+    ret = np.log(price_vals[p + horizon] / price_vals[p])
+    
+    S_values = S.to_numpy()[valid]
+    return pd.DataFrame({
+        'date': S.index[valid],
+        'S': S_values,
+        'return': ret,
+        'signal': S_values > S_threshold
+    })
+
+# 进程内缓存: key → 交易表
+_TRADES = {}
+
+def cached_trade_returns(market, S, index_prices, S_threshold, horizon=30):
+    """
+    compute_trade_returns 的两级缓存: 进程内 dict + cache/trades/{key}.parquet
+    key 由市场、阈值、持有期、两条序列的内容哈希（含索引）及 TRADES_CACHE_VERSION 生成，
+    重新下载或重算的数据即使日期范围相同也不会命中旧结果
+    """
+    key_str = (f"{market}|{S_threshold!r}|{horizon}|"
+               f"{int(pd.util.hash_pandas_object(S).sum())}|"
+               f"{int(pd.util.hash_pandas_object(index_prices).sum())}|"
+               f"{TRADES_CACHE_VERSION}")
+    key = hashlib.blake2b(key_str.encode(), digest_size=8).hexdigest()
+    if key in _TRADES:
+        return _TRADES[key]
+    
+    path = os.path.join(TRADES_CACHE_DIR, f'{key}.parquet')
+    try:
+        if os.path.exists(path):
+            trades = pd.read_parquet(path, engine='pyarrow')
+        else:
+            trades = compute_trade_returns(S, index_prices, S_threshold, horizon)
+            os.makedirs(TRADES_CACHE_DIR, exist_ok=True)
+            trades.to_parquet(path, engine='pyarrow', compression='zstd',
+                              compression_level=3, index=False)
+    except ImportError:  # 未安装 pyarrow 时只用进程内缓存
+        trades = compute_trade_returns(S, index_prices, S_threshold, horizon)
+    
+    _TRADES[key] = trades
+    return trades
+
+def lttb_indices(x, y, n_out=PLOT_POINTS):
+    """
+    Largest-Triangle-Three-Buckets 降采样: 返回保留点的下标（首尾必留）
+    每个桶里选与「上一个保留点、下一桶均值点」构成三角形面积最大的点
+    点数不超过 n_out 时原样返回全部下标；含 NaN（滚动熵开头的窗口期）时只在有限值点上降采样
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) < n:
+        return finite[lttb_indices(x[finite], y[finite], n_out)]
+    
+    # 中间 n-2 个点分成 n_out-2 个桶
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    
+    return out
+
+def downsample(series, n_out=PLOT_POINTS):
+    """按 LTTB 降采样一条日期索引的 Series，用于折线绘图"""
+    return series.iloc[lttb_indices(series.index.asi8, series.to_numpy(np.float64), n_out)]
 
 # ============================================
 # Figure 1: 纠缠熵时间序列
 # ============================================
 
+# 危机时期 (开始, 结束, 标签)，日期已转为 matplotlib 日期数值
+CRISIS_PERIODS = [
+    (mdates.date2num(pd.Timestamp(start)), mdates.date2num(pd.Timestamp(end)), label)
+    for start, end, label in [
+        ('2008-09-01', '2009-03-31', '2008\nCrisis'),
+        ('2011-08-01', '2011-10-31', '2011'),
+        ('2015-08-01', '2015-09-30', '2015'),
+        ('2018-12-01', '2018-12-31', '2018'),
+        ('2020-02-15', '2020-03-31', 'COVID-19'),
+        ('2022-01-01', '2022-10-31', '2022\nBear'),
+    ]
+]
+
+def shade_periods(ax, periods, **kwargs):
+    """把与当前 x 轴范围相交的时期画成竖直色带（同 axvspan，合为一个 PolyCollection）"""
+    xmin, xmax = ax.get_xlim()
+    verts = [[(x0, 0), (x0, 1), (x1, 1), (x1, 0)]
+             for x0, x1, _ in periods if x1 > xmin and x0 < xmax]
+    ax.add_collection(PolyCollection(verts, transform=ax.get_xaxis_transform(), **kwargs),
+                      autolim=False)
+
 def create_figure1(data, save_path=FIG1):
     """
     Figure 1: 纠缠熵时间序列（三面板）
@@ -120,8 +242,7 @@ def create_figure1(data, save_path=FIG1):
     
     # 参数
     train_end = pd.Timestamp('2020-01-01')
-    S_train = S[S.index < train_end]
-    S_threshold = S_train.quantile(0.90)
+    S_threshold = train_threshold(data, 'US', train_end)
     
     # 创建图形
     fig, axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True,
@@ -131,34 +252,22 @@ def create_figure1(data, save_path=FIG1):
     # Panel A: S&P 500 价格
     # =====================================
     ax1 = axes[0]
-    ax1.plot(index_prices.index, index_prices.values, 'b-', linewidth=0.8, label='S&P 500')
+    index_plot = downsample(index_prices)
+    ax1.plot(index_plot.index, index_plot.values, 'b-', linewidth=0.8, label='S&P 500')
     ax1.set_ylabel('S&P 500 Index', fontsize=11)
     ax1.set_title('(a) Market Index', fontsize=12, fontweight='bold')
     ax1.legend(loc='upper left')
     ax1.grid(True, alpha=0.3)
     
     # 标记危机时期
-    crisis_periods = [
-        ('2008-09-01', '2009-03-31', '2008\nCrisis'),
-        ('2011-08-01', '2011-10-31', '2011'),
-        ('2015-08-01', '2015-09-30', '2015'),
-        ('2018-12-01', '2018-12-31', '2018'),
-        ('2020-02-15', '2020-03-31', 'COVID-19'),
-        ('2022-01-01', '2022-10-31', '2022\nBear'),
-    ]
-    
-    for start, end, label in crisis_periods:
-        try:
-            ax1.axvspan(pd.Timestamp(start), pd.Timestamp(end), 
-                       alpha=0.2, color='red')
-        except:
-            pass
+    shade_periods(ax1, CRISIS_PERIODS, alpha=0.2, color='red')
     
     # =====================================
     # Panel B: 纠缠熵
     # =====================================
     ax2 = axes[1]
-    ax2.plot(S.index, S.values, 'purple', linewidth=0.8, label='Entanglement Entropy $\\mathcal{S}(t)$')
+    S_plot = downsample(S)
+    ax2.plot(S_plot.index, S_plot.values, 'purple', linewidth=0.8, label='Entanglement Entropy $\\mathcal{S}(t)$')
     ax2.axhline(y=S_threshold, color='red', linestyle='--', linewidth=1.5,
                 label=f'Threshold $\\mathcal{{S}}_c$ = {S_threshold:.2f} (90th percentile)')
     
@@ -178,22 +287,21 @@ def create_figure1(data, save_path=FIG1):
              fontsize=9, color='green', va='top')
     
     # 同样标记危机时期
-    for start, end, label in crisis_periods:
-        try:
-            ax2.axvspan(pd.Timestamp(start), pd.Timestamp(end), 
-                       alpha=0.2, color='red')
-        except:
-            pass
+    shade_periods(ax2, CRISIS_PERIODS, alpha=0.2, color='red')
     
     # =====================================
     # Panel C: 未来30日收益
     # =====================================
     ax3 = axes[2]
     future_returns = np.log(index_prices.shift(-30) / index_prices) * 100  # 转为百分比
-    
-    # 用颜色区分正负
-    colors = ['green' if r > 0 else 'red' for r in future_returns.values]
-    ax3.bar(future_returns.index, future_returns.values, width=2, color=colors, alpha=0.5)
+    ax3.set_ylim(-30, 30)  # 固定 y 范围，先于绘图设置
+    
+    # 用颜色区分正负: 正、负两部分各一个填充区域（代替逐日 bar 的数千个矩形）
+    # 逐日锯齿的填充区域在 PDF 中栅格化（savefig.dpi），坐标轴与文字仍为矢量
+    ax3.fill_between(future_returns.index, 0, future_returns.where(future_returns > 0, 0).values,
+                     color='green', alpha=0.5, linewidth=0, rasterized=True)
+    ax3.fill_between(future_returns.index, 0, future_returns.where(future_returns <= 0, 0).values,
+                     color='red', alpha=0.5, linewidth=0, rasterized=True)
     ax3.axhline(y=0, color='black', linewidth=0.5)
     ax3.axhline(y=-10, color='red', linestyle='--', linewidth=1, alpha=0.5, label='Crash threshold (-10%)')
     
@@ -202,7 +310,6 @@ def create_figure1(data, save_path=FIG1):
     ax3.set_xlabel('Date', fontsize=11)
     ax3.legend(loc='lower left', fontsize=9)
     ax3.grid(True, alpha=0.3)
-    ax3.set_ylim(-30, 30)
     
     # 格式化x轴日期
     ax3.xaxis.set_major_locator(mdates.YearLocator(2))
@@ -210,9 +317,10 @@ def create_figure1(data, save_path=FIG1):
     
     plt.tight_layout()
     plt.savefig(save_path, bbox_inches='tight', dpi=300)
-    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300)
+    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300,
+                pil_kwargs=PNG_KWARGS)
     print(f"Figure 1 saved: {save_path}")
-    plt.show()
+    plt.close(fig)
     
     return fig
 
@@ -230,18 +338,22 @@ def create_figure2(data, save_path=FIG2):
     
     # 参数
     train_end = pd.Timestamp('2020-01-01')
-    S_train = S[S.index < train_end]
     S_test = S[S.index >= train_end]
     index_test = index_prices[index_prices.index >= train_end]
-    S_threshold = S_train.quantile(0.90)
+    S_threshold = train_threshold(data, 'US', train_end)
     
     # 计算所有交易
-    trades = compute_trade_returns(S_test, index_test, S_threshold, horizon=30)
+    trades = cached_trade_returns('US', S_test, index_test, S_threshold, horizon=30)
     
     # 分组
     signal_returns = trades[trades['signal']]['return'].values * 100  # 转百分比
     random_returns = trades[~trades['signal']]['return'].values * 100
     
+    # 箱线图统计量（四分位、须、离群点、均值）只算一次，直方图均值线与标注共用
+    box_data = [random_returns, signal_returns]
+    box_stats = cbook.boxplot_stats(box_data, labels=['Random\nPeriods', 'High Entropy\nSignals'])
+    random_mean, signal_mean = means = [st['mean'] for st in box_stats]
+    
     # 创建图形
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
@@ -252,16 +364,17 @@ def create_figure2(data, save_path=FIG2):
     
     bins = np.linspace(-20, 25, 30)
     
-    ax1.hist(random_returns, bins=bins, alpha=0.5, color='gray', 
-             label=f'Random periods (n={len(random_returns)}, μ={np.mean(random_returns):.1f}%)',
-             density=True)
-    ax1.hist(signal_returns, bins=bins, alpha=0.7, color='red',
-             label=f'High entropy signals (n={len(signal_returns)}, μ={np.mean(signal_returns):.1f}%)',
-             density=True)
+    # 直方图: np.histogram 分箱后各画成一个填充阶梯（代替每箱一个矩形）
+    random_density, _ = np.histogram(random_returns, bins=bins, density=True)
+    signal_density, _ = np.histogram(signal_returns, bins=bins, density=True)
+    ax1.stairs(random_density, bins, fill=True, alpha=0.5, color='gray',
+               label=f'Random periods (n={len(random_returns)}, μ={random_mean:.1f}%)')
+    ax1.stairs(signal_density, bins, fill=True, alpha=0.7, color='red',
+               label=f'High entropy signals (n={len(signal_returns)}, μ={signal_mean:.1f}%)')
     
     # 均值线
-    ax1.axvline(x=np.mean(random_returns), color='gray', linestyle='--', linewidth=2)
-    ax1.axvline(x=np.mean(signal_returns), color='red', linestyle='--', linewidth=2)
+    ax1.axvline(x=random_mean, color='gray', linestyle='--', linewidth=2)
+    ax1.axvline(x=signal_mean, color='red', linestyle='--', linewidth=2)
     ax1.axvline(x=0, color='black', linestyle='-', linewidth=1)
     
     ax1.set_xlabel('30-Day Return (%)', fontsize=11)
@@ -275,9 +388,7 @@ def create_figure2(data, save_path=FIG2):
     # =====================================
     ax2 = axes[1]
     
-    box_data = [random_returns, signal_returns]
-    bp = ax2.boxplot(box_data, labels=['Random\nPeriods', 'High Entropy\nSignals'],
-                     patch_artist=True, widths=0.6)
+    bp = ax2.bxp(box_stats, patch_artist=True, widths=0.6)
     
     bp['boxes'][0].set_facecolor('lightgray')
     bp['boxes'][1].set_facecolor('lightcoral')
@@ -285,7 +396,6 @@ def create_figure2(data, save_path=FIG2):
     ax2.axhline(y=0, color='black', linestyle='-', linewidth=1)
     
     # 添加均值点
-    means = [np.mean(random_returns), np.mean(signal_returns)]
     ax2.scatter([1, 2], means, color='black', s=100, zorder=5, marker='D', label='Mean')
     
     # 添加统计信息
@@ -301,9 +411,10 @@ def create_figure2(data, save_path=FIG2):
     
     plt.tight_layout()
     plt.savefig(save_path, bbox_inches='tight', dpi=300)
-    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300)
+    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300,
+                pil_kwargs=PNG_KWARGS)
     print(f"Figure 2 saved: {save_path}")
-    plt.show()
+    plt.close(fig)
     
     return fig
 
@@ -328,16 +439,16 @@ def create_figure3(data, save_path=FIG3):
         S = data[market]['entropy']
         index_prices = data[market]['index']
         
-        S_train = S[S.index < train_end]
         S_test = S[S.index >= train_end]
         index_test = index_prices[index_prices.index >= train_end]
-        S_threshold = S_train.quantile(0.90)
+        S_threshold = train_threshold(data, market, train_end)
         
         # =====================================
         # 上行：纠缠熵时间序列（测试期）
         # =====================================
         ax_top = axes[0, i]
-        ax_top.plot(S_test.index, S_test.values, color=color, linewidth=0.8)
+        S_plot = downsample(S_test)
+        ax_top.plot(S_plot.index, S_plot.values, color=color, linewidth=0.8)
         ax_top.axhline(y=S_threshold, color='red', linestyle='--', linewidth=1.5)
         ax_top.fill_between(S_test.index, S_threshold, S_test.values,
                            where=(S_test.values > S_threshold),
@@ -353,7 +464,7 @@ def create_figure3(data, save_path=FIG3):
         # =====================================
         ax_bot = axes[1, i]
         
-        trades = compute_trade_returns(S_test, index_test, S_threshold, horizon=30)
+        trades = cached_trade_returns(market, S_test, index_test, S_threshold, horizon=30)
         signal_returns = trades[trades['signal']]['return'].values * 100
         
         if len(signal_returns) > 0:
@@ -375,9 +486,10 @@ def create_figure3(data, save_path=FIG3):
     
     plt.tight_layout()
     plt.savefig(save_path, bbox_inches='tight', dpi=300)
-    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300)
+    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300,
+                pil_kwargs=PNG_KWARGS)
     print(f"Figure 3 saved: {save_path}")
-    plt.show()
+    plt.close(fig)
     
     return fig
 
@@ -447,9 +559,10 @@ def create_figure4(save_path=FIG4):
     
     plt.tight_layout()
     plt.savefig(save_path, bbox_inches='tight', dpi=300)
-    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300)
+    plt.savefig(save_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=300,
+                pil_kwargs=PNG_KWARGS)
     print(f"Figure 4 saved: {save_path}")
-    plt.show()
+    plt.close(fig)
     
     return fig
 
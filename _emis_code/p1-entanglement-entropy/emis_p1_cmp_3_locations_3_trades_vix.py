@@ -7,8 +7,15 @@ import numpy as np
 import pandas as pd
 import os
 import warnings
+from functools import partial
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ============================================
 # 参数设置
 # ============================================
@@ -41,70 +48,74 @@ HORIZON = 30
 # ============================================
 
 def fix_timezone(df):
-    is_series = isinstance(df, pd.Series)
-    if is_series:
-        name = df.name
-        df = df.to_frame()
-    
-    df = df.reset_index()
-    date_col = df.columns[0]
-    df[date_col] = pd.to_datetime(df[date_col].astype(str).str[:10])
-    df = df.set_index(date_col)
-    
-    if is_series:
-        return df.iloc[:, 0].rename(name)
-    return df
+    """去掉时区和时间部分，索引只保留（当地）日期"""
+    idx = df.index
+    if isinstance(idx, pd.DatetimeIndex):
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        idx = idx.normalize()
+    else:
+        # 含混合时区偏移的字符串索引：截取日期部分
+        idx = pd.to_datetime(idx.astype(str).str[:10], format='%Y-%m-%d')
+    return df.set_axis(idx.rename(df.index.name))
 
 # ============================================
 # 三种交易方式
 # ============================================
 
-def trades_overlapping(S, index, threshold, horizon=30):
+def signal_returns(S_arr, idx_arr, threshold, horizon=30):
+    """
+    候选信号（前 len-horizon 天中 S > threshold）: 返回 (位置, horizon 日对数收益)
+    S_arr 与 idx_arr 是同一组交易日上对齐的 float64 数组
+    """
+    n = max(len(S_arr) - horizon, 0)
+    t = np.flatnonzero(S_arr[:n] > threshold)
+    ret = np.log(idx_arr[t + horizon] / idx_arr[t])
+    return t, ret
+
+def _trades_frame(dates, ret):
+    if len(ret) == 0:
+        return None
+    return pd.DataFrame({'date': dates, 'return': ret, 'win': ret > 0})
+
+def trades_overlapping(dates, S_arr, idx_arr, threshold, horizon=30):
     """重叠交易：每个信号都算"""
-    results = []
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        if S.iloc[t] > threshold and date in index.index:
-            idx = index.index.get_loc(date)
-            if idx + horizon < len(index):
-                ret = np.log(index.iloc[idx + horizon] / index.iloc[idx])
-                results.append({'date': date, 'return': ret, 'win': ret > 0})
-    return pd.DataFrame(results) if results else None
+    t, ret = signal_returns(S_arr, idx_arr, threshold, horizon)
+    return _trades_frame(dates[t], ret)
+
+@njit(cache=True)
+def _non_overlap_keep(t, horizon):
+    """候选位置 t（升序）中实际开仓的掩码：开仓后 horizon 天内的信号跳过"""
+    keep = np.zeros(len(t), dtype=np.bool_)
+    next_t = 0
+    for i in range(len(t)):
+        if t[i] >= next_t:
+            keep[i] = True
+            next_t = t[i] + horizon
+    return keep
 
-def trades_non_overlapping(S, index, threshold, horizon=30):
+def trades_non_overlapping(dates, S_arr, idx_arr, threshold, horizon=30):
     """不重叠交易：持有期内不交易"""
-    results = []
-    t = 0
-    while t < len(S) - horizon:
-        date = S.index[t]
-        if S.iloc[t] > threshold and date in index.index:
-            idx = index.index.get_loc(date)
-            if idx + horizon < len(index):
-                ret = np.log(index.iloc[idx + horizon] / index.iloc[idx])
-                results.append({'date': date, 'return': ret, 'win': ret > 0})
-                t += horizon
-                continue
-        t += 1
-    return pd.DataFrame(results) if results else None
+    t, ret = signal_returns(S_arr, idx_arr, threshold, horizon)
+    keep = _non_overlap_keep(t, horizon)
+    return _trades_frame(dates[t[keep]], ret[keep])
 
-def trades_weekly(S, index, threshold, horizon=30):
-    """每周一次：同一周只交易一次"""
-    results = []
-    last_week = None
-    
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        week = (date.year, date.isocalendar()[1])
-        
-        if S.iloc[t] > threshold and week != last_week:
-            if date in index.index:
-                idx = index.index.get_loc(date)
-                if idx + horizon < len(index):
-                    ret = np.log(index.iloc[idx + horizon] / index.iloc[idx])
-                    results.append({'date': date, 'return': ret, 'win': ret > 0})
-                    last_week = week
-    
-    return pd.DataFrame(results) if results else None
+def week_codes(dates):
+    """周键 年*100 + ISO周 (int64)，整段日期一次算出"""
+    return dates.year.to_numpy(np.int64) * 100 + dates.isocalendar().week.to_numpy(np.int64)
+
+def trades_weekly(dates, S_arr, idx_arr, threshold, horizon=30, weeks=None):
+    """每周一次：同一周只交易一次（weeks: 预先算好的 week_codes(dates)）"""
+    if weeks is None:
+        weeks = week_codes(dates)
+    t, ret = signal_returns(S_arr, idx_arr, threshold, horizon)
+    
+    # 与上一笔信号同周的跳过
+    week = weeks[t]
+    keep = np.ones(len(week), dtype=bool)
+    keep[1:] = week[1:] != week[:-1]
+    
+    return _trades_frame(dates[t[keep]], ret[keep])
 
 # ============================================
 # 加载数据
@@ -165,6 +176,12 @@ def process_market(market_name, entropy_file, index_file):
     threshold = S_train.quantile(0.90)
     print(f"  阈值 (90%): {threshold:.4f}")
     
+    # 测试期已按交易日对齐，交易函数直接按位置取值
+    dates = S_test.index
+    S_arr = S_test.to_numpy(np.float64)
+    idx_arr = index_test.to_numpy(np.float64)
+    weeks = week_codes(dates)
+    
     # 三种交易方式
     results_list = []
     
@@ -174,9 +191,9 @@ def process_market(market_name, entropy_file, index_file):
     for method_name, method_func in [
         ('重叠', trades_overlapping),
         ('不重叠', trades_non_overlapping),
-        ('每周一次', trades_weekly)
+        ('每周一次', partial(trades_weekly, weeks=weeks))
     ]:
-        results = method_func(S_test, index_test, threshold, HORIZON)
+        results = method_func(dates, S_arr, idx_arr, threshold, HORIZON)
         
         if results is not None and len(results) > 0:
             wr = results['win'].mean()
@@ -280,12 +297,17 @@ def main():
         print(f"\n  {'方式':<12} {'交易次数':<10} {'胜率':<10} {'平均收益':<12} {'累计收益':<12}")
         print("  " + "-"*58)
         
+        dates = vix_test.index
+        vix_arr = vix_test.to_numpy(np.float64)
+        sp500_arr = sp500_test.to_numpy(np.float64)
+        weeks = week_codes(dates)
+        
         for method_name, method_func in [
             ('重叠', trades_overlapping),
             ('不重叠', trades_non_overlapping),
-            ('每周一次', trades_weekly)
+            ('每周一次', partial(trades_weekly, weeks=weeks))
         ]:
-            results = method_func(vix_test, sp500_test, vix_threshold, HORIZON)
+            results = method_func(dates, vix_arr, sp500_arr, vix_threshold, HORIZON)
             
             if results is not None and len(results) > 0:
                 wr = results['win'].mean()
@@ -7,9 +7,17 @@ import pandas as pd
 import yfinance as yf
 import time
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时退化为普通 Python 函数
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ============================================
 # 参数设置
 # ============================================
@@ -32,6 +40,8 @@ START_DATE = '2005-01-01'
 TRAIN_END = '2020-01-01'
 WINDOW = 60
 HORIZON = 30
+DOWNLOAD_WORKERS = 4   # 并发下载的批数
+INDEX_TICKER = '^GDAXI'
 
 # 更新的德国股票列表
 DAX_TICKERS = [
@@ -68,6 +78,19 @@ DAX_TICKERS = [
 # 数据加载函数
 # ============================================
 
+def download_close(batch, retries=3):
+    """下载一批股票的收盘价；失败时按 3s、6s、12s（加随机抖动）退避重试"""
+    for attempt in range(retries):
+        # 并发请求前的随机抖动，避免同时打到 Yahoo 触发限流
+        time.sleep(random.uniform(0, 1))
+        try:
+            data = yf.download(batch, start=START_DATE, progress=False, threads=False)
+            return data['Close'] if not data.empty else None
+        except Exception as e:
+            print(f"    错误 {batch}: {e}")
+            time.sleep(3 * 2**attempt)
+    return None
+
 def load_stock_data():
     """加载股票数据（优先本地）"""
     
@@ -78,29 +101,26 @@ def load_stock_data():
         return prices
     
     print("本地无缓存，开始下载...")
-    all_data = []
+    batches = [DAX_TICKERS[i:i+5] for i in range(0, len(DAX_TICKERS), 5)]
+    if not os.path.exists(INDEX_CACHE):
+        batches[0] = [INDEX_TICKER] + batches[0]   # 指数随第一批一起下载，省去单独请求
+    print(f"  并发下载 {len(batches)} 批（每批 5 只）...")
     
-    for i in range(0, len(DAX_TICKERS), 5):
-        batch = DAX_TICKERS[i:i+5]
-        print(f"  下载 {i+1}-{min(i+5, len(DAX_TICKERS))}/{len(DAX_TICKERS)}: {batch}")
-        
-        try:
-            data = yf.download(batch, start=START_DATE, progress=False)
-            if not data.empty:
-                if isinstance(data.columns, pd.MultiIndex):
-                    all_data.append(data['Close'])
-                else:
-                    all_data.append(data['Close'])
-            time.sleep(1)
-        except Exception as e:
-            print(f"    错误: {e}")
-            time.sleep(3)
+    # 网络 IO 为主，多批请求并发发出
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as ex:
+        all_data = [d for d in ex.map(download_close, batches) if d is not None]
     
     if not all_data:
         print("❌ 下载失败")
         return None
     
     prices = pd.concat(all_data, axis=1)
+    if INDEX_TICKER in prices.columns:
+        # 拆出指数列写入指数缓存；去掉只有指数有报价的日期
+        index = prices.pop(INDEX_TICKER).dropna()
+        prices = prices.dropna(how='all')
+        index.to_csv(INDEX_CACHE)
+        print(f"已保存: {INDEX_CACHE}")
     prices.to_csv(STOCK_CACHE)
     print(f"已保存: {STOCK_CACHE}")
     
@@ -116,75 +136,90 @@ def load_index_data():
         return index
     
     print("下载 DAX 指数...")
-    time.sleep(2)
-    
-    try:
-        data = yf.download('^GDAXI', start=START_DATE, progress=False)
-        if data.empty:
-            print("❌ 下载失败")
-            return None
-        
-        index = data['Close']
-        if isinstance(index, pd.DataFrame):
-            index = index.iloc[:, 0]
-        
-        index.to_csv(INDEX_CACHE)
-        print(f"已保存: {INDEX_CACHE}")
-        return index
-        
-    except Exception as e:
-        print(f"错误: {e}")
+    data = download_close([INDEX_TICKER])
+    if data is None:
+        print("❌ 下载失败")
         return None
+    
+    index = data.iloc[:, 0] if isinstance(data, pd.DataFrame) else data
+    index.to_csv(INDEX_CACHE)
+    print(f"已保存: {INDEX_CACHE}")
+    return index
 
 # ============================================
 # 计算函数
 # ============================================
 
 def compute_returns(prices):
-    return np.log(prices / prices.shift(1)).dropna()
+    # 直接在数组上计算对数收益，丢弃含 NaN 的行（等价于 shift + dropna）
+    A = prices.to_numpy(np.float64)
+    R = np.log(A[1:] / A[:-1])
+    keep = ~np.isnan(R).any(axis=1)
+    return pd.DataFrame(R[keep], index=prices.index[1:][keep], columns=prices.columns)
+
+@njit(cache=True)
+def _entropy_kernel(R, window, degenerate):
+    """滚动窗口纠缠熵的主循环（R: T×N float64 收益；degenerate: 跳过的窗口）"""
+    T, N = R.shape
+    ridge = np.eye(N) * 1e-6
+    S_values = np.full(len(degenerate), np.nan)
+    
+    # 窗口 R[t-window:t] 的列和与叉积和：每步加入一行、移出一行，O(N²) 更新
+    Sx = R[:window].sum(axis=0)
+    Sxy = R[:window].T @ R[:window]
+    
+    for t in range(window, T):
+        if not degenerate[t - window]:
+            cov = Sxy / window - np.outer(Sx, Sx) / window**2
+            d = np.sqrt(np.diag(cov))
+            Sigma = cov / np.outer(d, d) + ridge
+            # Sigma 对称正定：log det = 2 Σ log diag(L)；Cholesky 失败时退回 slogdet
+            try:
+                L = np.linalg.cholesky(Sigma)
+                S_values[t - window] = -2.0 * np.log(np.diag(L)).sum() / N
+            except Exception:
+                sign, logdet = np.linalg.slogdet(Sigma)
+                if sign > 0:
+                    S_values[t - window] = -logdet / N
+        
+        inc = R[t]
+        out = R[t - window]
+        Sx += inc - out
+        Sxy += np.outer(inc, inc) - np.outer(out, out)
+    
+    return S_values
 
 def compute_entanglement_entropy(returns, window=60):
     """计算纠缠熵"""
-    S_list = []
-    dates = []
-    N = returns.shape[1]
-    
-    for t in range(window, len(returns)):
-        window_returns = returns.iloc[t-window:t]
-        Sigma = window_returns.corr().values
-        Sigma = Sigma + np.eye(N) * 1e-6
-        det_Sigma = np.linalg.det(Sigma)
-        
-        if det_Sigma > 0:
-            S = -np.log(det_Sigma) / N
-        else:
-            S = np.nan
-        
-        S_list.append(S)
-        dates.append(returns.index[t])
+    R = np.ascontiguousarray(returns.to_numpy(np.float64))
+    T, N = R.shape
+    n_out = max(T - window, 0)
     
-    return pd.Series(S_list, index=dates, name='S')
+    # 窗口内收益全为 0 的股票（停牌/前向填充）方差为 0，相关系数无定义 → S 记为 NaN
+    nz = np.vstack([np.zeros((1, N), dtype=np.int64), np.cumsum(R != 0, axis=0)])
+    degenerate = ((nz[window:window + n_out] - nz[:n_out]) == 0).any(axis=1)
+    
+    S_values = _entropy_kernel(R, window, degenerate) if n_out > 0 else np.full(0, np.nan)
+    return pd.Series(S_values, index=returns.index[window:], name='S')
 
 def test_strategy(S, index, threshold, horizon=30):
     """测试策略"""
-    results = []
+    # 前 len(S)-horizon 天中 S > 阈值、日期在指数中且 horizon 天后仍有价格
+    n = max(len(S) - horizon, 0)
+    pos = index.index.get_indexer(S.index[:n])
+    values = S.to_numpy(np.float64)[:n]
+    t = np.flatnonzero((values > threshold) & (pos >= 0) & (pos + horizon < len(index)))
+    if len(t) == 0:
+        return None
     
-    for t in range(len(S) - horizon):
-        date = S.index[t]
-        value = S.iloc[t]
-        
-        if value > threshold and date in index.index:
-            idx = index.index.get_loc(date)
-            if idx + horizon < len(index):
-                ret = np.log(index.iloc[idx + horizon] / index.iloc[idx])
-                results.append({
-                    'date': date,
-                    'S': value,
-                    'return': ret,
-                    'win': ret > 0
-                })
-    
-    return pd.DataFrame(results) if results else None
+    prices = index.to_numpy(np.float64)
+    ret = np.log(prices[pos[t] + horizon] / prices[pos[t]])
+    return pd.DataFrame({
+        'date': S.index[t],
+        'S': values[t],
+        'return': ret,
+        'win': ret > 0
+    })
 
 # ============================================
 # 主程序